@@ -6,15 +6,21 @@ using LLM function calling through the OpenAI-compatible API (OpenRouter,
 OpenAI, or local Ollama).
 """
 
+import asyncio
 import base64
+import hashlib
 import io
 import json
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
-import httpx
+import aiohttp
 from PIL import Image
 
+from backend.cache import LRUCache
 from backend.config import get
 from backend.logging_config import get_logger
 from backend.llm_config import resolve_llm_config, get_chat_model, is_remote_api, build_auth_headers
@@ -108,6 +114,109 @@ FORMAT: Use only simple HTML tags: <b>, <p>, <i>, <br>, <ul>, <li>. No backticks
 MAX_AGENT_STEPS = get("agent", "max_steps")
 IMG_DIR = Path(get("agent", "img_dir"))
 
+# Compact JSON for tool responses and SSE payloads: no separator padding and
+# no \uXXXX escaping, with the encoder built once instead of per call
+_dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+# Completed assistant messages keyed by a hash of the full request payload and
+# the content of the pages behind it, stored as (expires_at, message) so
+# repeated agent trajectories skip the LLM. Guarded by a lock since sessions
+# may run on different threads.
+LLM_CACHE_SIZE = get("agent", "llm_cache_size")
+_llm_response_cache = LRUCache(max_size=LLM_CACHE_SIZE)
+_llm_response_cache_lock = threading.Lock()
+
+
+def _llm_cache_key(payload: dict, page_hashes: dict) -> str:
+    """
+    Hash a chat completion payload independent of dict key order.
+
+    page_hashes maps each doc id the session has surfaced to a hash of its
+    image, so the same conversation over changed page images misses the cache.
+    """
+    key_data = {"payload": payload, "pages": page_hashes}
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _get_cached_llm_message(key: str):
+    """Return a cached assistant message, or None if missing or expired."""
+    with _llm_response_cache_lock:
+        entry = _llm_response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, message = entry
+        if time.monotonic() >= expires_at:
+            _llm_response_cache.delete(key)
+            return None
+        return message
+
+
+def _set_cached_llm_message(key: str, message: dict) -> None:
+    """Cache an assistant message for agent.llm_cache_ttl_seconds."""
+    expires_at = time.monotonic() + get("agent", "llm_cache_ttl_seconds")
+    with _llm_response_cache_lock:
+        _llm_response_cache.set(key, (expires_at, message))
+
+
+# Shared across agent sessions so LLM calls reuse pooled keep-alive connections
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session for LLM calls, creating it on first use."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=get("agent", "http_pool_size"),
+                keepalive_timeout=get("agent", "http_keepalive_seconds"),
+                ttl_dns_cache=300,
+            )
+        )
+    return _http_session
+
+
+async def close_http_session() -> None:
+    """Close the shared aiohttp session (called on application shutdown)."""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
+@lru_cache(maxsize=256)
+def _encode_image_b64(path: str, mtime: float, quality: int, max_dim: int) -> str:
+    """
+    Base64-encode a page image for a data URL, cached by path and mtime.
+
+    JPEGs already within max_dim are sent as-is, skipping a PIL re-encode;
+    larger images are downscaled to fit max_dim (vision models downsample
+    anyway) and anything else is re-encoded to JPEG at the given quality.
+    """
+    data = Path(path).read_bytes()
+    with Image.open(io.BytesIO(data)) as img:
+        if img.format != "JPEG" or max(img.size) > max_dim:
+            resized = img.convert("RGB")
+            resized.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+            buf = io.BytesIO()
+            resized.save(buf, format="JPEG", quality=quality)
+            data = buf.getvalue()
+    return base64.b64encode(data).decode("ascii")
+
+
+def _image_content_part(img_path: Path) -> dict:
+    """Build an OpenAI-compatible image content part from an image file."""
+    b64 = _encode_image_b64(
+        str(img_path),
+        img_path.stat().st_mtime,
+        get("agent", "jpeg_quality"),
+        get("image", "max_api_dimension"),
+    )
+    return {
+        "type": "image_url",
+        "image_url": {"url": f"data:image/jpeg;base64,{b64}"},
+    }
+
 
 class AgentSession:
     """Manages a single agent reasoning session."""
@@ -118,9 +227,16 @@ class AgentSession:
         self.query = query
         self.current_results = []
         self.all_doc_ids = []
+        # Mirror of all_doc_ids for O(1) membership checks
+        self._seen_doc_ids = set()
+        # doc id -> hash of the page image, part of the LLM cache key
+        self.page_hashes = {}
 
     async def _search(self, search_query: str, ranking: str = "hybrid") -> dict:
         """Execute a search against Vespa and return formatted results."""
+        # Collapse whitespace so trivially different reformulations hit the
+        # query embedding LRU cache instead of re-running the encoder
+        search_query = " ".join(search_query.split())
         q_embs, idx_to_token = self.sim_map_generator.get_query_embeddings_and_token_map(
             search_query
         )
@@ -142,14 +258,18 @@ class AgentSession:
         for i, child in enumerate(children):
             fields = child.get("fields", {})
             doc_id = fields.get("id", "")
-            if doc_id and doc_id not in self.all_doc_ids:
+            if doc_id and doc_id not in self._seen_doc_ids:
+                self._seen_doc_ids.add(doc_id)
                 self.all_doc_ids.append(doc_id)
+            if doc_id:
+                blur_image = fields.get("blur_image") or ""
+                self.page_hashes[doc_id] = hashlib.md5(blur_image.encode("utf-8")).hexdigest()
             results_summary.append({
                 "index": i,
                 "title": fields.get("title", "Unknown"),
                 "page_number": fields.get("page_number", 0) + 1,
-                "relevance": child.get("relevance", 0),
-                "snippet": fields.get("snippet", "")[:get("agent", "snippet_preview_length")],
+                # Kept short: every tool message is re-sent on each later step,
+                # and get_page_text returns the full text on demand
                 "text_preview": (fields.get("text", "") or "")[:get("agent", "text_preview_length")],
             })
 
@@ -171,46 +291,49 @@ class AgentSession:
             "url": fields.get("url", ""),
         }
 
-    async def _collect_images(self) -> list:
-        """Collect available images for the gathered doc_ids."""
-        images = []
+    async def _fetch_and_save(self, doc_id: str, img_path: Path, semaphore: asyncio.Semaphore) -> None:
+        """Fetch a full page image from Vespa and write it to disk."""
+        async with semaphore:
+            try:
+                image_data = await self.vespa_client.get_full_image_from_vespa(doc_id)
+                with open(img_path, "wb") as f:
+                    f.write(base64.b64decode(image_data))
+            except Exception as e:
+                logger.warning(f"Failed to fetch image for {doc_id}: {e}")
 
+    async def _collect_images(self) -> list:
+        """Collect (doc_id, image path) pairs for the gathered doc_ids."""
         max_images = get("agent", "max_images")
-        for doc_id in self.all_doc_ids[:max_images]:
-            img_path = IMG_DIR / f"{doc_id}.jpg"
-            if not img_path.exists():
-                # Fetch from Vespa
-                try:
-                    image_data = await self.vespa_client.get_full_image_from_vespa(doc_id)
-                    with open(img_path, "wb") as f:
-                        f.write(base64.b64decode(image_data))
-                except Exception as e:
-                    logger.warning(f"Failed to fetch image for {doc_id}: {e}")
-                    continue
+        candidates = [(doc_id, IMG_DIR / f"{doc_id}.jpg") for doc_id in self.all_doc_ids[:max_images]]
 
-            if img_path.exists():
-                try:
-                    images.append(Image.open(img_path))
-                except Exception as e:
-                    logger.warning(f"Failed to open image {img_path}: {e}")
+        # Fetch missing images from Vespa concurrently
+        missing = [(doc_id, img_path) for doc_id, img_path in candidates if not img_path.exists()]
+        if missing:
+            semaphore = asyncio.Semaphore(get("agent", "image_fetch_concurrency"))
+            await asyncio.gather(
+                *(self._fetch_and_save(doc_id, img_path, semaphore) for doc_id, img_path in missing)
+            )
 
-        return images
+        return [(doc_id, img_path) for doc_id, img_path in candidates if img_path.exists()]
 
-    def _build_image_content_parts(self, images: list) -> list:
-        """Convert PIL images to OpenAI-compatible content parts."""
-        parts = []
-        for img in images:
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG", quality=get("agent", "jpeg_quality"))
-            b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-            parts.append({
-                "type": "image_url",
-                "image_url": {"url": f"data:image/jpeg;base64,{b64}"},
-            })
-        return parts
+    async def _encode_image_parts(self, images: list) -> list:
+        """Encode images to content parts in worker threads (None where encoding fails)."""
+
+        async def _encode(img_path: Path):
+            try:
+                return await asyncio.to_thread(_image_content_part, img_path)
+            except Exception as e:
+                logger.warning(f"Failed to encode image {img_path}: {e}")
+                return None
 
-    def _build_image_content_parts_with_metadata(self, images: list) -> list:
-        """Convert PIL images to content parts with document metadata labels."""
+        return await asyncio.gather(*(_encode(img_path) for _, img_path in images))
+
+    async def _build_image_content_parts(self, images: list) -> list:
+        """Convert (doc_id, image path) pairs to OpenAI-compatible content parts."""
+        return [part for part in await self._encode_image_parts(images) if part is not None]
+
+    async def _build_image_content_parts_with_metadata(self, images: list) -> list:
+        """Convert (doc_id, image path) pairs to content parts with document metadata labels."""
         parts = []
         # Build metadata lookup from all_doc_ids and current_results
         doc_metadata = {}
@@ -223,29 +346,122 @@ class AgentSession:
                     "page_number": fields.get("page_number", 0) + 1,
                 }
 
-        for i, img in enumerate(images):
-            # Add metadata label before each image
-            if i < len(self.all_doc_ids):
-                doc_id = self.all_doc_ids[i]
-                meta = doc_metadata.get(doc_id, {})
-                title = meta.get("title", "Unknown")
-                page = meta.get("page_number", "?")
-                parts.append({
-                    "type": "text",
-                    "text": f"[Document {i+1}: \"{title}\", Page {page}]",
-                })
+        image_parts = await self._encode_image_parts(images)
+        for i, ((doc_id, _), image_part) in enumerate(zip(images, image_parts)):
+            if image_part is None:
+                continue
 
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG", quality=get("agent", "jpeg_quality"))
-            b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
+            # Add metadata label before each image
+            meta = doc_metadata.get(doc_id, {})
+            title = meta.get("title", "Unknown")
+            page = meta.get("page_number", "?")
             parts.append({
-                "type": "image_url",
-                "image_url": {"url": f"data:image/jpeg;base64,{b64}"},
+                "type": "text",
+                "text": f"[Document {i+1}: \"{title}\", Page {page}]",
             })
+            parts.append(image_part)
 
         parts.append({"type": "text", "text": f"\n\nQuestion: {self.query}"})
         return parts
 
+    async def _stream_completion(
+        self,
+        client: aiohttp.ClientSession,
+        url: str,
+        headers: dict,
+        payload: dict,
+        timeout: aiohttp.ClientTimeout,
+    ) -> AsyncGenerator[tuple, None]:
+        """
+        Stream a chat completion as ("content", fragment) events carrying only
+        the newly arrived text, a ("tool_call", (index, id, name, args)) event
+        as soon as a tool call's arguments form complete JSON, and a final
+        ("message", message) event once the response is complete.
+
+        Tool call arguments arrive piecewise across chunks and are accumulated
+        per tool call index into a regular assistant message.
+        """
+        content = ""
+        tool_calls = {}
+        reported = set()
+
+        async with client.post(
+            url, headers=headers, json={**payload, "stream": True}, timeout=timeout
+        ) as resp:
+            resp.raise_for_status()
+            async for raw_line in resp.content:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta") or {}
+                except (json.JSONDecodeError, KeyError, IndexError):
+                    continue
+
+                for tc in delta.get("tool_calls") or []:
+                    index = tc.get("index", 0)
+                    entry = tool_calls.setdefault(index, {
+                        "id": "",
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""},
+                    })
+                    if tc.get("id"):
+                        entry["id"] = tc["id"]
+                    fn = tc.get("function") or {}
+                    if fn.get("name"):
+                        entry["function"]["name"] = fn["name"]
+                    if fn.get("arguments"):
+                        entry["function"]["arguments"] += fn["arguments"]
+
+                    # Arguments are a JSON object, so a closing brace that
+                    # parses means they are complete
+                    arguments = entry["function"]["arguments"]
+                    if index not in reported and entry["function"]["name"] and arguments.rstrip().endswith("}"):
+                        try:
+                            args = json.loads(arguments)
+                        except json.JSONDecodeError:
+                            continue
+                        reported.add(index)
+                        yield "tool_call", (index, entry["id"], entry["function"]["name"], args)
+
+                text = delta.get("content")
+                if text:
+                    content += text
+                    yield "content", text
+
+        message = {"role": "assistant", "content": content or None}
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
+        yield "message", message
+
+    async def _with_heartbeat(self, events: AsyncGenerator, interval: float) -> AsyncGenerator:
+        """Re-yield events, yielding None whenever interval passes without one."""
+        pending = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(events.__anext__())
+                done, _ = await asyncio.wait({pending}, timeout=interval)
+                if not done:
+                    yield None
+                    continue
+                task, pending = pending, None
+                try:
+                    event = task.result()
+                except StopAsyncIteration:
+                    return
+                yield event
+        finally:
+            if pending is not None:
+                pending.cancel()
+                # Let the cancelled step finish so the generator can be closed
+                await asyncio.wait({pending})
+            # Release the inner generator's HTTP response back to the pool
+            await events.aclose()
+
     async def run(self) -> AsyncGenerator[str, None]:
         """Run the agent loop, yielding SSE events for each step."""
         yield self._sse_event("status", "Agent starting...")
@@ -271,105 +487,148 @@ class AgentSession:
         final_answer = None
 
         try:
-            async with httpx.AsyncClient(timeout=get("agent", "client_timeout_seconds")) as client:
-                while steps_taken < MAX_AGENT_STEPS:
-                    # Call LLM with tools
+            timeout = aiohttp.ClientTimeout(total=get("agent", "client_timeout_seconds"))
+            client = get_http_session()
+            while steps_taken < MAX_AGENT_STEPS:
+                payload = {
+                    "model": chat_model,
+                    "messages": messages,
+                    "tools": AGENT_TOOLS,
+                    "tool_choice": "auto",
+                }
+                cache_key = _llm_cache_key(payload, self.page_hashes) if LLM_CACHE_SIZE > 0 else None
+                message = _get_cached_llm_message(cache_key) if cache_key else None
+
+                # Search started while the LLM was still streaming: (task, query, ranking)
+                early_search = None
+
+                if message is not None:
+                    logger.debug(f"Agent LLM cache hit: {cache_key[:12]}")
+                else:
+                    # Call LLM with tools, streaming partial content as it arrives
+                    # and keeping the connection alive through long silences
                     try:
-                        resp = await client.post(
-                            f"{base_url}/chat/completions",
-                            headers=headers,
-                            json={
-                                "model": chat_model,
-                                "messages": messages,
-                                "tools": AGENT_TOOLS,
-                                "tool_choice": "auto",
-                            },
-                        )
-                        resp.raise_for_status()
-                        response_data = resp.json()
+                        async for event in self._with_heartbeat(
+                            self._stream_completion(
+                                client, f"{base_url}/chat/completions", headers, payload, timeout
+                            ),
+                            get("agent", "heartbeat_seconds"),
+                        ):
+                            if event is None:
+                                yield ": heartbeat\n\n"
+                                continue
+                            kind, value = event
+                            if kind == "content":
+                                yield self._sse_event("delta", value.replace("\n", "<br>"))
+                            elif kind == "tool_call":
+                                index, _, fn_name, fn_args = value
+                                if index == 0 and fn_name == "search_documents":
+                                    # Overlap the Vespa search with the rest of the LLM stream
+                                    search_query = fn_args.get("query", self.query)
+                                    ranking = fn_args.get("ranking", "hybrid")
+                                    early_search = (
+                                        asyncio.create_task(self._search(search_query, ranking)),
+                                        search_query,
+                                        ranking,
+                                    )
+                                    yield self._sse_event("tool_call", _dumps({
+                                        "tool": "search_documents",
+                                        "query": search_query,
+                                        "ranking": ranking,
+                                        "step": steps_taken + 1,
+                                    }))
+                            else:
+                                message = value
                     except Exception as e:
+                        if early_search is not None:
+                            early_search[0].cancel()
                         logger.error(f"Agent LLM call failed: {e}", exc_info=True)
                         yield self._sse_event("error", "Agent encountered an error. Please try again.")
                         yield self._sse_event("close", "")
                         return
 
-                    choice = response_data["choices"][0]
-                    message = choice["message"]
+                    if cache_key:
+                        _set_cached_llm_message(cache_key, message)
 
-                    # Append assistant message to conversation
-                    messages.append(message)
+                # Append assistant message to conversation
+                messages.append(message)
 
-                    # Check if model wants to call tools
-                    tool_calls = message.get("tool_calls", [])
+                # Check if model wants to call tools
+                tool_calls = message.get("tool_calls") or []
 
-                    if not tool_calls:
-                        # Model gave a text response without tool calls
-                        content = message.get("content", "")
-                        if content:
-                            final_answer = content.replace("\n", "<br>")
-                        break
+                if not tool_calls:
+                    # Model gave a text response without tool calls
+                    content = message.get("content", "")
+                    if content:
+                        final_answer = content.replace("\n", "<br>")
+                    break
 
-                    # Process tool calls
-                    for tool_call in tool_calls:
-                        fn_name = tool_call["function"]["name"]
-                        try:
-                            fn_args = json.loads(tool_call["function"]["arguments"])
-                        except json.JSONDecodeError:
-                            fn_args = {}
+                # Process tool calls
+                for i, tool_call in enumerate(tool_calls):
+                    fn_name = tool_call["function"]["name"]
+                    try:
+                        fn_args = json.loads(tool_call["function"]["arguments"])
+                    except json.JSONDecodeError:
+                        fn_args = {}
 
-                        steps_taken += 1
+                    steps_taken += 1
 
-                        if fn_name == "search_documents":
-                            search_query = fn_args.get("query", self.query)
-                            ranking = fn_args.get("ranking", "hybrid")
-                            yield self._sse_event("tool_call", json.dumps({
+                    if fn_name == "search_documents":
+                        search_query = fn_args.get("query", self.query)
+                        ranking = fn_args.get("ranking", "hybrid")
+
+                        if i == 0 and early_search is not None and early_search[1:] == (search_query, ranking):
+                            result = await early_search[0]
+                        else:
+                            if i == 0 and early_search is not None:
+                                early_search[0].cancel()
+                            yield self._sse_event("tool_call", _dumps({
                                 "tool": "search_documents",
                                 "query": search_query,
                                 "ranking": ranking,
                                 "step": steps_taken,
                             }))
-
                             result = await self._search(search_query, ranking)
-                            tool_response = json.dumps(result)
-                            yield self._sse_event("tool_result", json.dumps({
-                                "tool": "search_documents",
-                                "num_results": result["num_results"],
-                                "step": steps_taken,
-                            }))
-
-                        elif fn_name == "get_page_text":
-                            result_index = int(fn_args.get("result_index", 0))
-                            yield self._sse_event("tool_call", json.dumps({
-                                "tool": "get_page_text",
-                                "result_index": result_index,
-                                "step": steps_taken,
-                            }))
-
-                            result = self._get_page_text(result_index)
-                            tool_response = json.dumps(result)
-                            yield self._sse_event("tool_result", json.dumps({
-                                "tool": "get_page_text",
-                                "title": result.get("title", ""),
-                                "step": steps_taken,
-                            }))
-
-                        elif fn_name == "provide_answer":
-                            final_answer = fn_args.get("answer", "")
-                            yield self._sse_event("thinking", "Composing final answer...")
-                            tool_response = json.dumps({"status": "answer_accepted"})
-
-                        else:
-                            tool_response = json.dumps({"error": f"Unknown tool: {fn_name}"})
-
-                        # Append tool result to conversation
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call["id"],
-                            "content": tool_response,
-                        })
-
-                    if final_answer:
-                        break
+                        tool_response = _dumps(result)
+                        yield self._sse_event("tool_result", _dumps({
+                            "tool": "search_documents",
+                            "num_results": result["num_results"],
+                            "step": steps_taken,
+                        }))
+
+                    elif fn_name == "get_page_text":
+                        result_index = int(fn_args.get("result_index", 0))
+                        yield self._sse_event("tool_call", _dumps({
+                            "tool": "get_page_text",
+                            "result_index": result_index,
+                            "step": steps_taken,
+                        }))
+
+                        result = self._get_page_text(result_index)
+                        tool_response = _dumps(result)
+                        yield self._sse_event("tool_result", _dumps({
+                            "tool": "get_page_text",
+                            "title": result.get("title", ""),
+                            "step": steps_taken,
+                        }))
+
+                    elif fn_name == "provide_answer":
+                        final_answer = fn_args.get("answer", "")
+                        yield self._sse_event("thinking", "Composing final answer...")
+                        tool_response = _dumps({"status": "answer_accepted"})
+
+                    else:
+                        tool_response = _dumps({"error": f"Unknown tool: {fn_name}"})
+
+                    # Append tool result to conversation
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call["id"],
+                        "content": tool_response,
+                    })
+
+                if final_answer:
+                    break
 
         except Exception as e:
             logger.error(f"Agent session failed: {e}", exc_info=True)
@@ -387,29 +646,31 @@ class AgentSession:
                     fb_model = get_chat_model()
                     fb_headers = build_auth_headers(fb_api_key)
 
-                    image_parts = self._build_image_content_parts_with_metadata(images)
-
-                    async with httpx.AsyncClient(timeout=get("agent", "answer_timeout_seconds")) as client:
-                        resp = await client.post(
-                            f"{fb_base_url}/chat/completions",
-                            headers=fb_headers,
-                            json={
-                                "model": fb_model,
-                                "messages": [
-                                    {"role": "system", "content": """Answer the user's question using ONLY the provided document images. Do NOT use outside knowledge.
+                    image_parts = await self._build_image_content_parts_with_metadata(images)
+
+                    timeout = aiohttp.ClientTimeout(total=get("agent", "answer_timeout_seconds"))
+                    client = get_http_session()
+                    async with client.post(
+                        f"{fb_base_url}/chat/completions",
+                        headers=fb_headers,
+                        timeout=timeout,
+                        json={
+                            "model": fb_model,
+                            "messages": [
+                                {"role": "system", "content": """Answer the user's question using ONLY the provided document images. Do NOT use outside knowledge.
 For every claim, cite the document and page where you found it: <b>(Source: [Title], Page [N])</b>.
 If you cannot answer from these documents, say: "I could not find enough information in the provided documents to answer this question."
 Use only simple HTML tags: <b>, <p>, <i>, <br>, <ul>, <li>. No backticks or tables.
 End with a <b>Sources</b> section listing all referenced documents and pages."""},
-                                    {"role": "user", "content": image_parts},
-                                ],
-                            },
-                        )
+                                {"role": "user", "content": image_parts},
+                            ],
+                        },
+                    ) as resp:
                         resp.raise_for_status()
-                        answer_data = resp.json()
-                        content = answer_data["choices"][0]["message"].get("content", "")
-                        if content:
-                            final_answer = content.replace("\n", "<br>")
+                        answer_data = await resp.json(content_type=None)
+                    content = answer_data["choices"][0]["message"].get("content", "")
+                    if content:
+                        final_answer = content.replace("\n", "<br>")
                 except Exception as e:
                     logger.error(f"Agent answer generation failed: {e}", exc_info=True)
                     final_answer = "I encountered an error while generating the answer."
@@ -437,6 +698,7 @@ async def run_agent(
     Events emitted:
     - status: General status updates
     - thinking: Agent reasoning steps
+    - delta: Text fragment to append to the current reasoning step
     - tool_call: Tool being called (JSON with tool name and args)
     - tool_result: Tool result summary (JSON)
     - answer: The final answer (HTML)
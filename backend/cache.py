@@ -24,3 +24,6 @@ class LRUCache:
     def delete(self, key):
         if key in self.cache:
             del self.cache[key]
+
+    def clear(self):
+        self.cache.clear()
@@ -22,6 +22,11 @@ from backend.logging_config import get_logger
 
 _CACHE_MAXSIZE = get("colpali", "lru_cache_maxsize")
 
+# Tokens excluded from similarity maps (see SimMapGenerator.should_filter_token)
+_FILTER_TOKEN_RE = re.compile(
+    r"^<.*$|^\s+$|^(?!.*\d)(?!▁)[^\w\s]+$|^_.*$|^Question$|^▁$"
+)
+
 
 class SimMapGenerator:
     """
@@ -260,10 +265,7 @@ class SimMapGenerator:
         Returns:
             bool: True if the token should be filtered out, False otherwise.
         """
-        pattern = re.compile(
-            r"^<.*$|^\s+$|^(?!.*\d)(?!▁)[^\w\s]+$|^_.*$|^Question$|^▁$"
-        )
-        return bool(pattern.match(token))
+        return bool(_FILTER_TOKEN_RE.match(token))
 
     @lru_cache(maxsize=_CACHE_MAXSIZE)
     def get_query_embeddings_and_token_map(
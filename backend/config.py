@@ -7,6 +7,7 @@ Sensitive values come from .env via os.environ (also no fallback defaults).
 
 import os
 import tomllib
+from functools import cache
 from pathlib import Path
 from typing import Any
 
@@ -25,11 +26,16 @@ with open(_CONFIG_PATH, "rb") as _f:
     _CONFIG = tomllib.load(_f)
 
 
+@cache
 def get(*keys: str) -> Any:
     """Traverse nested TOML config by dotted keys.
 
     Example: get("vespa", "schema_name") -> "pdf_page"
     Raises RuntimeError if any key is missing.
+
+    The config is loaded once at import and never mutated, so each key path
+    is resolved once and served from a cache afterwards. Call
+    get.cache_clear() if the config is ever reloaded.
     """
     current = _CONFIG
     path = ".".join(keys)
@@ -45,6 +45,7 @@ BOUNDARY_TOLERANCE = get("drawing_regions", "pdf_vector", "boundary_tolerance")
 BORDER_TOLERANCE = get("drawing_regions", "pdf_vector", "border_tolerance")
 CONTAINED_TOLERANCE = get("drawing_regions", "pdf_vector", "contained_tolerance")
 TINY_PATH_THRESHOLD = get("drawing_regions", "pdf_vector", "tiny_path_threshold")
+FRAMING_RECT_MIN_AREA_PCT = get("drawing_regions", "pdf_vector", "framing_rect_min_area_pct")
 
 # Confidence scores from ki55.toml
 TABLE_REGION_CONFIDENCE = get("drawing_regions", "confidence", "table_region")
@@ -55,9 +56,18 @@ CONTAINMENT_RATIO = get("drawing_regions", "confidence", "containment_ratio")
 # Heuristic detection parameters from ki55.toml
 DENSITY_SCALING_FACTOR = get("drawing_regions", "density_scaling_factor")
 NEIGHBORHOOD_DIVISOR = get("drawing_regions", "neighborhood_divisor")
+CONTENT_THRESHOLD = get("drawing_regions", "content_threshold")
+MIN_GAP = get("drawing_regions", "min_gap")
+WHITESPACE_THRESHOLD = get("drawing_regions", "whitespace_threshold")
+CONTENT_DENSITY_THRESHOLD = get("drawing_regions", "content_density_threshold")
 
+# Tiling parameters from ki55.toml
+TARGET_TILE_SIZE = get("drawing_regions", "target_tile_size")
+GRID_SIZE = get("drawing_regions", "grid_size")
+REGION_EXTRACT_PADDING = get("drawing_regions", "region_extract_padding")
 
-@dataclass
+
+@dataclass(slots=True)
 class DetectedRegion:
     """A detected sub-region of a drawing page."""
     x: int  # Left coordinate
@@ -91,21 +101,26 @@ class DetectedRegion:
         }
 
 
-def should_detect_regions(image: Image.Image, force: bool = False) -> bool:
+def should_detect_regions(
+    image: Image.Image, force: bool = False, pixel_count: Optional[int] = None
+) -> bool:
     """
     Determine if an image is large enough to benefit from region detection.
 
     Args:
         image: PIL Image to evaluate
         force: If True, always detect regions regardless of size
+        pixel_count: Precomputed width * height, if the caller already has it
 
     Returns:
         True if the image should have region detection applied
     """
     if force:
         return True
-    w, h = image.size
-    return (w * h) > LARGE_PAGE_THRESHOLD
+    if pixel_count is None:
+        w, h = image.size
+        pixel_count = w * h
+    return pixel_count > LARGE_PAGE_THRESHOLD
 
 
 def _is_vector_pdf(page) -> bool:
@@ -318,7 +333,7 @@ def _classify_cluster(cluster_bbox, drawing_bboxes, text_bboxes):
         return "detail"
 
 
-def _find_framing_rects(drawings, page_width, page_height, border_rects, min_area_pct=None):
+def _find_framing_rects(drawings, page_width, page_height, border_rects, min_area_pct=FRAMING_RECT_MIN_AREA_PCT):
     """
     Find internal framing rectangles that define content regions.
 
@@ -336,8 +351,6 @@ def _find_framing_rects(drawings, page_width, page_height, border_rects, min_are
     Returns:
         List of (x0, y0, x1, y1) tuples in point coordinates
     """
-    if min_area_pct is None:
-        min_area_pct = get("drawing_regions", "pdf_vector", "framing_rect_min_area_pct")
     page_area = page_width * page_height
     min_area = page_area * min_area_pct
     framing_rects = []
@@ -557,16 +570,21 @@ def detect_regions_pdf_vector(
         claimed_areas_pts.append((t_x0, t_y0, t_x1, t_y1))
 
     # Step 8: Cluster remaining elements not inside framed/table areas
-    unclaimed_bboxes = []
-    for bbox in drawing_bboxes + text_bboxes:
-        bx0, by0, bx1, by1 = bbox
-        in_claimed = False
-        for cx0, cy0, cx1, cy1 in claimed_areas_pts:
-            if bx0 >= cx0 - CONTAINED_TOLERANCE and by0 >= cy0 - CONTAINED_TOLERANCE and bx1 <= cx1 + CONTAINED_TOLERANCE and by1 <= cy1 + CONTAINED_TOLERANCE:
-                in_claimed = True
-                break
-        if not in_claimed:
-            unclaimed_bboxes.append(bbox)
+    # Containment test for all (element, claimed area) pairs at once; CAD pages
+    # can carry thousands of vector paths
+    all_bboxes = drawing_bboxes + text_bboxes
+    if all_bboxes and claimed_areas_pts:
+        boxes = np.asarray(all_bboxes, dtype=np.float64)[:, None, :]
+        claimed = np.asarray(claimed_areas_pts, dtype=np.float64)[None, :, :]
+        in_claimed = (
+            (boxes[..., 0] >= claimed[..., 0] - CONTAINED_TOLERANCE)
+            & (boxes[..., 1] >= claimed[..., 1] - CONTAINED_TOLERANCE)
+            & (boxes[..., 2] <= claimed[..., 2] + CONTAINED_TOLERANCE)
+            & (boxes[..., 3] <= claimed[..., 3] + CONTAINED_TOLERANCE)
+        ).any(axis=1)
+        unclaimed_bboxes = [bbox for bbox, is_claimed in zip(all_bboxes, in_claimed) if not is_claimed]
+    else:
+        unclaimed_bboxes = all_bboxes
 
     # Cluster using proximity threshold (in points, convert from pixels)
     proximity_pts = ELEMENT_PROXIMITY_PX / dpi_scale
@@ -644,18 +662,15 @@ def detect_regions_heuristic(
     gray = np.array(image.convert("L"))
 
     # Threshold: pixels below 240 are "content" (drawings are mostly black on white)
-    content_thresh = get("drawing_regions", "content_threshold")
-    content_mask = gray < content_thresh
+    content_mask = gray < CONTENT_THRESHOLD
 
     # Find horizontal whitespace bands (rows with very little content)
     row_density = content_mask.mean(axis=1)  # fraction of content pixels per row
-    min_gap = get("drawing_regions", "min_gap")
-    ws_threshold = get("drawing_regions", "whitespace_threshold")
-    h_splits = _find_splits(row_density, min_gap=min_gap, threshold=ws_threshold)
+    h_splits = _find_splits(row_density, min_gap=MIN_GAP, threshold=WHITESPACE_THRESHOLD)
 
     # Find vertical whitespace bands (columns with very little content)
     col_density = content_mask.mean(axis=0)  # fraction of content pixels per column
-    v_splits = _find_splits(col_density, min_gap=min_gap, threshold=ws_threshold)
+    v_splits = _find_splits(col_density, min_gap=MIN_GAP, threshold=WHITESPACE_THRESHOLD)
 
     # Add image boundaries
     h_boundaries = [0] + h_splits + [h]
@@ -680,8 +695,7 @@ def detect_regions_heuristic(
 
             # Check if region actually has meaningful content
             region_content = content_mask[y1:y2, x1:x2]
-            content_density_threshold = get("drawing_regions", "content_density_threshold")
-            if region_content.mean() < content_density_threshold:
+            if region_content.mean() < CONTENT_DENSITY_THRESHOLD:
                 continue
 
             regions.append(DetectedRegion(
@@ -756,7 +770,7 @@ def _generate_tiles(
     # Target tile size: aim for tiles that give ColPali good coverage
     # ColPali input is typically resized to ~768-1024px, so tiles of ~1500-2000px
     # give 2:1 compression ratio instead of the original 6:1+
-    target_tile = get("drawing_regions", "target_tile_size")
+    target_tile = TARGET_TILE_SIZE
     overlap = TILE_OVERLAP
 
     tiles = []
@@ -823,20 +837,18 @@ def detect_regions_content_aware_tiling(
     gray = np.array(image.convert("L"))
 
     # Content mask (pixels below threshold are content)
-    content_thresh = get("drawing_regions", "content_threshold")
-    content_mask = (gray < content_thresh).astype(np.float32)
+    content_mask = (gray < CONTENT_THRESHOLD).astype(np.float32)
 
     # Compute coarse density on a grid
-    grid_size = get("drawing_regions", "grid_size")
-    rows_per_cell = max(1, h // grid_size)
-    cols_per_cell = max(1, w // grid_size)
+    rows_per_cell = max(1, h // GRID_SIZE)
+    cols_per_cell = max(1, w // GRID_SIZE)
 
     # Row and column density profiles
     row_density = content_mask.mean(axis=1)
     col_density = content_mask.mean(axis=0)
 
     # Target tile size
-    target_tile = get("drawing_regions", "target_tile_size")
+    target_tile = TARGET_TILE_SIZE
     overlap = TILE_OVERLAP
 
     # Calculate how many tiles we need
@@ -1216,7 +1228,7 @@ def extract_region_images(
         List of (cropped_image, region) tuples
     """
     if padding is None:
-        padding = get("drawing_regions", "region_extract_padding")
+        padding = REGION_EXTRACT_PADDING
     w, h = image.size
     results = []
 
@@ -1272,15 +1284,16 @@ def detect_and_extract_regions(
         If no region detection is needed, returns [(original_image, full_page_region)].
     """
     w, h = image.size
+    pixel_count = w * h
 
-    if not should_detect_regions(image, force=force):
+    if not should_detect_regions(image, force=force, pixel_count=pixel_count):
         full_region = DetectedRegion(
             x=0, y=0, width=w, height=h,
             label="full_page", region_type="full_page",
         )
         return [(image, full_region)]
 
-    logger.info(f"Image {w}x{h} qualifies for region detection (area={w*h:,} > threshold={LARGE_PAGE_THRESHOLD:,})")
+    logger.info(f"Image {w}x{h} qualifies for region detection (area={pixel_count:,} > threshold={LARGE_PAGE_THRESHOLD:,})")
 
     det_kwargs = dict(
         min_region_size=min_region_size,
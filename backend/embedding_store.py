@@ -0,0 +1,171 @@
+"""
+Contiguous memory-mapped store of per-document float embeddings.
+
+All patches live in one (total_patches, 128) float32 array with per-document
+offsets (structure of arrays), so reranking slices a document's embedding out
+of an mmap instead of parsing Vespa's JSON tensor blocks. Pages are demand
+loaded through the OS page cache.
+
+The store is built offline from the per-document .npy rerank cache
+(search.embedding_cache_dir) with scripts/build_embedding_store.py. It records
+the embedding version it was packed from and each document's content
+fingerprint, so stale entries are skipped rather than scored.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from backend.config import get
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PATCHES_FILE = "all_patches.npy"
+OFFSETS_FILE = "doc_offsets.npy"
+KEYS_FILE = "doc_keys.json"
+FINGERPRINTS_FILE = "doc_fingerprints.json"
+VERSION_FILE = "version.json"
+
+
+def doc_key(doc_id: str) -> str:
+    """Filesystem-safe key for a document id."""
+    return hashlib.sha1(doc_id.encode("utf-8")).hexdigest()
+
+
+def embedding_fingerprint(float_cells: dict) -> str:
+    """
+    Cheap content fingerprint of Vespa float embedding cells.
+
+    Hashes the patch count and the first, middle and last patch vectors
+    rather than the whole payload, which would cost as much as the parse the
+    cache saves. Re-embedding a page changes every patch, so it changes the
+    fingerprint.
+    """
+    blocks = float_cells.get("blocks", {})
+    n = len(blocks)
+    sample = [n] + [blocks.get(str(i)) for i in (0, n // 2, n - 1)]
+    return hashlib.blake2b(json.dumps(sample).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def cache_filename(doc_id: str, fingerprint: str, version: int) -> str:
+    """Name of a document's entry in the per-document embedding cache."""
+    return f"{doc_key(doc_id)}_{fingerprint}_v{version}_f.npy"
+
+
+class EmbeddingStore:
+    """Read-only view over packed patch embeddings with per-document offsets."""
+
+    def __init__(
+        self,
+        patches: np.ndarray,
+        offsets: np.ndarray,
+        keys: list[str],
+        fingerprints: list[str],
+        version: int | None = None,
+    ):
+        self.patches = patches
+        self.offsets = offsets
+        self.fingerprints = fingerprints
+        self.version = version
+        self.key_to_idx = {key: idx for idx, key in enumerate(keys)}
+
+    @classmethod
+    def load(cls, store_dir: Path) -> "EmbeddingStore":
+        """Memory-map a store written by build_embedding_store."""
+        patches = np.load(store_dir / PATCHES_FILE, mmap_mode="r")
+        offsets = np.load(store_dir / OFFSETS_FILE)
+        keys = json.loads((store_dir / KEYS_FILE).read_text())
+        fingerprints = json.loads((store_dir / FINGERPRINTS_FILE).read_text())
+        version_file = store_dir / VERSION_FILE
+        version = json.loads(version_file.read_text()) if version_file.exists() else None
+        return cls(patches, offsets, keys, fingerprints, version)
+
+    def __len__(self) -> int:
+        return len(self.key_to_idx)
+
+    def get(self, doc_id: str, fingerprint: str) -> np.ndarray | None:
+        """
+        Return a document's (num_patches, 128) embedding.
+
+        None if the document is not stored, or was stored for other content
+        than fingerprint (see embedding_fingerprint) describes.
+        """
+        idx = self.key_to_idx.get(doc_key(doc_id))
+        if idx is None or self.fingerprints[idx] != fingerprint:
+            return None
+        return self.patches[self.offsets[idx]:self.offsets[idx + 1]]
+
+
+def build_embedding_store(cache_dir: Path, store_dir: Path, version: int = 1) -> int:
+    """
+    Pack every cached per-document embedding of a version into one store.
+
+    Args:
+        cache_dir: Per-document .npy cache written during reranking
+        store_dir: Output directory for the packed store
+        version: Embedding version to pack
+
+    Returns:
+        int: Number of documents written
+    """
+    suffix = f"_v{version}_f.npy"
+    # Newest cached fingerprint per document, in key order
+    latest = {}
+    for f in cache_dir.glob(f"*{suffix}"):
+        key, fingerprint = f.name[:-len(suffix)].rsplit("_", 1)
+        if key not in latest or f.stat().st_mtime > latest[key][0].stat().st_mtime:
+            latest[key] = (f, fingerprint)
+    keys = sorted(latest)
+    arrays = [np.load(latest[key][0], mmap_mode="r") for key in keys]
+
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([a.shape[0] for a in arrays])
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    patches = np.lib.format.open_memmap(
+        store_dir / PATCHES_FILE,
+        mode="w+",
+        dtype=np.float32,
+        shape=(int(offsets[-1]), get("colpali", "embedding_dim")),
+    )
+    for i, array in enumerate(arrays):
+        patches[offsets[i]:offsets[i + 1]] = array
+    patches.flush()
+    del patches
+
+    np.save(store_dir / OFFSETS_FILE, offsets)
+    (store_dir / KEYS_FILE).write_text(json.dumps(keys))
+    (store_dir / FINGERPRINTS_FILE).write_text(json.dumps([latest[key][1] for key in keys]))
+    (store_dir / VERSION_FILE).write_text(json.dumps(version))
+    return len(keys)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_store() -> EmbeddingStore | None:
+    """
+    Load the configured store once per process.
+
+    Returns None if no store is configured, or if it was packed from a different
+    embedding version than search.embedding_cache_version (stale after a re-embed).
+    """
+    store_dir = get("search", "embedding_store_dir")
+    if not store_dir:
+        return None
+    try:
+        store = EmbeddingStore.load(Path(store_dir))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Embedding store at {store_dir} unavailable: {e}")
+        return None
+    expected_version = get("search", "embedding_cache_version")
+    if store.version != expected_version:
+        logger.warning(
+            f"Embedding store at {store_dir} was built for version {store.version}, "
+            f"expected {expected_version}; ignoring it until it is rebuilt"
+        )
+        return None
+    logger.info(f"Loaded embedding store with {len(store)} documents from {store_dir}")
+    return store
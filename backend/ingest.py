@@ -8,6 +8,7 @@ import hashlib
 import io
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional, Tuple
 
@@ -25,6 +26,10 @@ from backend.drawing_regions import (
 
 logger = get_logger(__name__)
 
+# Shared pool for JPEG encoding and Vespa feeding: PIL encoders and HTTP
+# requests release the GIL, so a batch's pages overlap instead of running serially
+_feed_pool = ThreadPoolExecutor(max_workers=get("ingestion", "feed_workers"))
+
 
 def validate_pdf(file_bytes: bytes) -> Tuple[bool, str]:
     """
@@ -67,16 +72,23 @@ def float_to_binary_embedding(float_embedding: np.ndarray) -> list:
     return binary.tolist()
 
 
+# ASCII control chars (0x00-0x1F and 0x7F) except tab, newline, carriage return,
+# mapped to None for str.translate
+_CONTROL_CHARS_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f])
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]')
+
+
 def sanitize_text(text: str) -> str:
     """Remove illegal control characters from extracted PDF text.
 
     Vespa rejects text containing certain control characters like null (0x0).
     This removes all ASCII control characters except common whitespace.
     """
-    if not text:
+    # Clean text layers are the common case: a search-only scan avoids building a copy
+    if not text or not _CONTROL_CHARS_RE.search(text):
         return text
-    # Remove ASCII control chars (0x00-0x1F and 0x7F) except tab, newline, carriage return
-    return re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', text)
+    return text.translate(_CONTROL_CHARS_TABLE)
 
 
 def render_page(page, dpi: int = None) -> Tuple[Image.Image, str]:
@@ -198,7 +210,7 @@ def generate_doc_id(pdf_bytes: bytes, title: str) -> str:
     content_hash = hashlib.md5(pdf_bytes).hexdigest()[:hash_length]
     # Create safe title slug: alphanumeric only, max chars from config
     slug_max_length = get("ingestion", "doc_id_slug_max_length")
-    safe_title = re.sub(r'[^a-zA-Z0-9]', '_', title)[:slug_max_length].strip('_').lower()
+    safe_title = _NON_ALNUM_RE.sub('_', title)[:slug_max_length].strip('_').lower()
     if not safe_title:
         safe_title = "document"
     return f"{safe_title}_{content_hash}"
@@ -247,7 +259,7 @@ def ingest_pdf(
         Tuple of (success, message, pages_indexed)
     """
     # Default title from filename
-    if title is None or title.strip() == "":
+    if not title or title.isspace():
         title = Path(filename).stem
 
     # Default tags to empty list
@@ -281,6 +293,67 @@ def ingest_pdf(
         doc.close()
         return False, "PDF has no pages", 0
 
+    # Standard pages waiting for a batched embedding pass:
+    # (page_num, image, page_text, page_doc_id)
+    pending_pages = []
+
+    def flush_pending_pages() -> int:
+        """Embed and feed all queued standard pages; returns how many were indexed."""
+        if not pending_pages:
+            return 0
+        batch = pending_pages[:]
+        pending_pages.clear()
+
+        try:
+            embeddings = generate_embeddings(
+                model, processor, [image for _, image, _, _ in batch], device, batch_size
+            )
+        except Exception as e:
+            for _, _, _, page_doc_id in batch:
+                failed_docs.append((page_doc_id, f"Embedding error: {e}"))
+            return 0
+
+        def index_page(item) -> Tuple[str, bool, str]:
+            (page_num, image, page_text, page_doc_id), (bin_emb, float_emb) = item
+            snippet = page_text[:snippet_ingest_length] + "..." if len(page_text) > snippet_ingest_length else page_text
+            if not snippet:
+                snippet = f"Page {page_num + 1} of {filename}"
+
+            vespa_doc = {
+                "id": page_doc_id,
+                "fields": {
+                    "id": page_doc_id,
+                    "url": filename,
+                    "title": title,
+                    "page_number": page_num + 1,
+                    "text": page_text,
+                    "snippet": snippet,
+                    "description": description,
+                    "tags": tags,
+                    "blur_image": create_blur_image(image),
+                    "full_image": image_to_base64(image),
+                    "embedding": bin_emb,
+                    "embedding_float": float_emb,
+                    "questions": [],
+                    "queries": [],
+                    "is_region": False,
+                    "parent_doc_id": "",
+                    "region_label": "",
+                    "region_type": "full_page",
+                    "region_bbox": "",
+                    "s3_key": s3_key or "",
+                },
+            }
+            return feed_document(vespa_app, vespa_doc)
+
+        indexed = 0
+        for page_doc_id, success, error in _feed_pool.map(index_page, zip(batch, embeddings)):
+            if success:
+                indexed += 1
+            else:
+                failed_docs.append((page_doc_id, error))
+        return indexed
+
     try:
         for page_num in range(len(doc)):
             page = doc[page_num]
@@ -312,10 +385,15 @@ def ingest_pdf(
                     failed_docs.append((page_doc_id, f"Embedding error: {e}"))
                     continue
 
-                # Feed each region as a document
-                for region_idx, ((region_img, region_meta), (bin_emb, float_emb)) in enumerate(
-                    zip(region_results, region_embeddings)
-                ):
+                # Feed each region as a document; page values are bound as
+                # defaults so the closure never sees a later loop iteration's
+                def index_region(
+                    item,
+                    page_num=page_num,
+                    page_text=page_text,
+                    page_doc_id=page_doc_id,
+                ) -> Tuple[str, bool, str]:
+                    region_idx, ((region_img, region_meta), (bin_emb, float_emb)) = item
                     is_full_page = region_meta.region_type == "full_page"
                     if is_full_page:
                         doc_id = page_doc_id
@@ -353,58 +431,23 @@ def ingest_pdf(
                             "s3_key": s3_key or "",
                         },
                     }
+                    return feed_document(vespa_app, vespa_doc)
 
-                    _, success, error = feed_document(vespa_app, vespa_doc)
+                for doc_id, success, error in _feed_pool.map(
+                    index_region, enumerate(zip(region_results, region_embeddings))
+                ):
                     if success:
                         docs_indexed += 1
                     else:
                         failed_docs.append((doc_id, error))
             else:
-                # Standard single-page processing (no region detection)
-                try:
-                    embeddings = generate_embeddings(
-                        model, processor, [image], device, batch_size
-                    )
-                    bin_emb, float_emb = embeddings[0]
-                except Exception as e:
-                    failed_docs.append((page_doc_id, f"Embedding error: {e}"))
-                    continue
-
-                snippet = page_text[:snippet_ingest_length] + "..." if len(page_text) > snippet_ingest_length else page_text
-                if not snippet:
-                    snippet = f"Page {page_num + 1} of {filename}"
-
-                vespa_doc = {
-                    "id": page_doc_id,
-                    "fields": {
-                        "id": page_doc_id,
-                        "url": filename,
-                        "title": title,
-                        "page_number": page_num + 1,
-                        "text": page_text,
-                        "snippet": snippet,
-                        "description": description,
-                        "tags": tags,
-                        "blur_image": create_blur_image(image),
-                        "full_image": image_to_base64(image),
-                        "embedding": bin_emb,
-                        "embedding_float": float_emb,
-                        "questions": [],
-                        "queries": [],
-                        "is_region": False,
-                        "parent_doc_id": "",
-                        "region_label": "",
-                        "region_type": "full_page",
-                        "region_bbox": "",
-                        "s3_key": s3_key or "",
-                    },
-                }
+                # Standard single-page processing (no region detection):
+                # queue the page so embeddings run in full batches
+                pending_pages.append((page_num, image, page_text, page_doc_id))
+                if len(pending_pages) >= batch_size:
+                    docs_indexed += flush_pending_pages()
 
-                _, success, error = feed_document(vespa_app, vespa_doc)
-                if success:
-                    docs_indexed += 1
-                else:
-                    failed_docs.append((page_doc_id, error))
+        docs_indexed += flush_pending_pages()
     finally:
         doc.close()
 
@@ -471,7 +514,7 @@ def ingest_image(
     Returns:
         Tuple of (success, message, pages_indexed)
     """
-    if title is None or title.strip() == "":
+    if not title or title.isspace():
         title = Path(filename).stem
     if tags is None:
         tags = []
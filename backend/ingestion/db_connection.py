@@ -80,6 +80,9 @@ class DatabaseConnection:
                 ssl="prefer" if self._config.ssl else "disable",
                 min_size=get("ingestion", "pool_min_size"),
                 max_size=self._config.pool_size,
+                # Repeated queries (schema discovery, change detection) reuse
+                # the server-side prepared statement instead of re-parsing.
+                statement_cache_size=get("ingestion", "statement_cache_size"),
             )
             self._logger.info(
                 f"Connected to database {self._config.database} at {self._config.host}"
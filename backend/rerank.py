@@ -5,14 +5,44 @@ This module provides reranking functionality using full-precision MaxSim computa
 after retrieving candidate documents from Vespa.
 """
 
+import os
+import uuid
+from pathlib import Path
+
 import numpy as np
 import torch
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 from backend.config import get
+from backend.embedding_store import (
+    cache_filename,
+    doc_key,
+    embedding_fingerprint,
+    get_embedding_store,
+)
+from backend.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 EMBEDDING_DIM = get("colpali", "embedding_dim")
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+_RERANK_DTYPES = {"float32": torch.float32, "bfloat16": torch.bfloat16}
+
+
+def _rerank_dtype() -> torch.dtype:
+    """Resolve the configured MaxSim GEMM precision."""
+    name = get("search", "rerank_dtype")
+    if name not in _RERANK_DTYPES:
+        raise ValueError(
+            f"Invalid search.rerank_dtype {name!r}; expected one of {sorted(_RERANK_DTYPES)}"
+        )
+    return _RERANK_DTYPES[name]
+
 
 def parse_float_embedding(float_cells: Dict) -> np.ndarray:
     """
@@ -33,17 +63,65 @@ def parse_float_embedding(float_cells: Dict) -> np.ndarray:
     if not blocks:
         return np.array([])
 
-    # Sort patches by index
-    patch_indices = sorted([int(k) for k in blocks.keys()])
-    num_patches = len(patch_indices)
+    # Sort the original string keys numerically and convert all patches in
+    # a single C-level pass instead of one list->ndarray conversion per patch
+    patch_keys = sorted(blocks, key=int)
+    return np.asarray(
+        [blocks[k] for k in patch_keys], dtype=np.float32
+    ).reshape(-1, EMBEDDING_DIM)
+
 
-    # Parse each patch's float embedding
-    embeddings = np.zeros((num_patches, EMBEDDING_DIM), dtype=np.float32)
+def load_float_embedding(
+    doc_id: str,
+    float_cells: Dict,
+    cache_dir: Optional[Path],
+    version: int = 1,
+) -> np.ndarray:
+    """
+    Parse a float embedding, reusing a memory-mapped .npy copy when cached.
 
-    for i, patch_idx in enumerate(patch_indices):
-        embeddings[i] = np.array(blocks[str(patch_idx)], dtype=np.float32)
+    The parsed (num_patches, 128) array is written once per (doc_id, content
+    fingerprint, version) so later reranks of the same document load it with
+    np.load(mmap_mode="r") instead of walking Vespa's JSON blocks again. A page
+    re-ingested under the same id gets a new fingerprint, and the entry it
+    supersedes is deleted. Nothing else is evicted: the directory holds at most
+    one entry per document and version, and can be deleted at any time.
+
+    Args:
+        doc_id: Document id the embedding belongs to
+        float_cells: Vespa float embedding cells (fingerprinted, parsed on cache miss)
+        cache_dir: Cache directory, or None to always parse
+        version: Embedding version, part of the cache key
 
-    return embeddings
+    Returns:
+        np.ndarray: Embeddings of shape (num_patches, 128)
+    """
+    if cache_dir is None or not doc_id:
+        return parse_float_embedding(float_cells)
+
+    path = cache_dir / cache_filename(doc_id, embedding_fingerprint(float_cells), version)
+    try:
+        return np.load(path, mmap_mode="r")
+    except (FileNotFoundError, ValueError):
+        pass
+
+    embedding = parse_float_embedding(float_cells)
+    if embedding.size:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write under a unique temporary name and rename so readers never
+            # see a partial file, even with concurrent writers of the same doc
+            tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, embedding)
+            os.replace(tmp_path, path)
+            # Drop entries for earlier content of the same document
+            for stale in cache_dir.glob(f"{doc_key(doc_id)}_*_v{version}_f.npy"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Failed to cache embedding for {doc_id}: {e}")
+    return embedding
 
 
 def unpack_binary_embedding(binary_cells: Dict) -> np.ndarray:
@@ -67,23 +145,87 @@ def unpack_binary_embedding(binary_cells: Dict) -> np.ndarray:
     if not blocks:
         return np.array([])
 
-    # Sort patches by index
-    patch_indices = sorted([int(k) for k in blocks.keys()])
-    num_patches = len(patch_indices)
+    # Stack all patches into one (num_patches, 16) array and unpack every
+    # byte in a single call instead of one np.unpackbits per patch
+    patch_keys = sorted(blocks, key=int)
+    packed = np.asarray([blocks[k] for k in patch_keys], dtype=np.int8)
+    # View as uint8 for unpackbits: each byte becomes 8 bits
+    bits = np.unpackbits(packed.view(np.uint8), axis=1)
+
+    # Convert 0/1 to -1/+1 for proper similarity computation
+    return bits.astype(np.float32) * 2 - 1
+
+
+def pack_binary_embedding(binary_cells: Dict) -> np.ndarray:
+    """
+    Stack Vespa's binary embedding blocks into packed bits without unpacking.
+
+    Args:
+        binary_cells: Vespa embedding format with "blocks" containing
+                     patch-indexed int8 arrays
+
+    Returns:
+        np.ndarray: Packed embeddings of shape (num_patches, 16), dtype uint8
+    """
+    blocks = binary_cells.get("blocks", {})
+    if not blocks:
+        return np.array([], dtype=np.uint8)
+
+    patch_keys = sorted(blocks, key=int)
+    return np.asarray([blocks[k] for k in patch_keys], dtype=np.int8).view(np.uint8)
+
+
+def binarize_query(query_embs) -> np.ndarray:
+    """
+    Binarize query embeddings the same way documents are binarized at feed time.
+
+    Returns:
+        np.ndarray: Packed query bits of shape (num_query_tokens, 16), dtype uint8
+    """
+    return np.packbits(_query_to_numpy(query_embs) > 0, axis=1)
+
+
+# Set-bit count for every byte value, used where np.bitwise_count (numpy>=2) is missing
+_POPCOUNT_LUT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
 
-    # Unpack each patch's binary embedding
-    unpacked = np.zeros((num_patches, EMBEDDING_DIM), dtype=np.float32)
+def _popcount(x: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    return _POPCOUNT_LUT[x]
 
-    for i, patch_idx in enumerate(patch_indices):
-        binary_int8 = np.array(blocks[str(patch_idx)], dtype=np.int8)
-        # Convert int8 to uint8 for unpackbits
-        binary_uint8 = binary_int8.view(np.uint8)
-        # Unpack bits: each int8 becomes 8 bits
-        bits = np.unpackbits(binary_uint8)
-        # Convert 0/1 to -1/+1 for proper similarity computation
-        unpacked[i] = bits.astype(np.float32) * 2 - 1
 
-    return unpacked
+def compute_max_sim_binary(query_bits: np.ndarray, doc_bits: np.ndarray) -> float:
+    """
+    Compute MaxSim between a binarized query and binary document patches.
+
+    With both sides as +/-1 vectors the dot product is
+    EMBEDDING_DIM - 2 * hamming_distance, so scores come from xor + popcount
+    on the packed bytes without unpacking to float.
+
+    Args:
+        query_bits: Packed query bits, shape (num_query_tokens, 16)
+        doc_bits: Packed document bits, shape (num_patches, 16)
+
+    Returns:
+        float: MaxSim score
+    """
+    if doc_bits.size == 0:
+        return 0.0
+
+    # (num_query_tokens, num_patches) Hamming distances
+    hamming = _popcount(query_bits[:, None, :] ^ doc_bits[None, :, :]).sum(
+        axis=2, dtype=np.int32
+    )
+    # Max dot product per query token is the min Hamming distance
+    return float(np.sum(EMBEDDING_DIM - 2 * hamming.min(axis=1)))
+
+
+def _query_to_numpy(query_embs) -> np.ndarray:
+    """Convert query embeddings (torch or numpy, any float dtype) to float32 numpy."""
+    if isinstance(query_embs, torch.Tensor):
+        return query_embs.detach().float().cpu().numpy()
+    return np.asarray(query_embs, dtype=np.float32)
 
 
 def compute_max_sim(
@@ -105,11 +247,11 @@ def compute_max_sim(
     if doc_emb.size == 0:
         return 0.0
 
-    # Convert query embeddings to numpy if needed
-    if isinstance(query_embs, torch.Tensor):
-        q_emb = query_embs.cpu().numpy().astype(np.float32)
-    else:
-        q_emb = query_embs.astype(np.float32)
+    q_emb = _query_to_numpy(query_embs)
+
+    # Single patch: the max over patches is that patch's dot product
+    if doc_emb.shape[0] == 1:
+        return float((q_emb @ doc_emb[0]).sum())
 
     # Compute similarity matrix: (num_query_tokens, num_patches)
     # Each entry is the dot product between a query token and a document patch
@@ -122,6 +264,138 @@ def compute_max_sim(
     return float(max_sim_score)
 
 
+if njit is not None:
+
+    # Reassociation/contraction for SIMD dot products, without the no-inf/no-nan
+    # assumptions of fastmath=True
+    @njit(parallel=True, fastmath={"contract", "reassoc", "arcp"}, cache=True)
+    def _max_sim_segments(q, docs, offsets):
+        """
+        Fused GEMM + max + sum over per-document patch segments.
+
+        Every segment must be non-empty: the max is seeded from its first patch.
+        """
+        num_docs = offsets.shape[0] - 1
+        scores = np.zeros(num_docs, dtype=np.float32)
+        for d in prange(num_docs):
+            total = np.float32(0.0)
+            for t in range(q.shape[0]):
+                best = np.float32(0.0)
+                for p in range(offsets[d], offsets[d + 1]):
+                    dot = np.float32(0.0)
+                    for k in range(q.shape[1]):
+                        dot += q[t, k] * docs[p, k]
+                    if p == offsets[d] or dot > best:
+                        best = dot
+                total += best
+            scores[d] = total
+        return scores
+
+    logger.info("numba available, using fused MaxSim kernel for CPU reranking")
+else:
+    _max_sim_segments = None
+
+
+def warm_up_max_sim_kernel() -> None:
+    """
+    Compile the fused MaxSim kernel on trivial input.
+
+    numba compiles lazily on first call, so the app calls this from a startup
+    hook (off the event loop) to keep the JIT cost out of the first search.
+    A no-op without numba.
+    """
+    if _max_sim_segments is None:
+        return
+    _max_sim_segments(
+        np.zeros((1, 1), dtype=np.float32),
+        np.zeros((1, 1), dtype=np.float32),
+        np.array([0, 1], dtype=np.int64),
+    )
+
+
+def _rerank_device(query_embs: torch.Tensor) -> torch.device:
+    """Pick the device for reranking: the query's own GPU, any GPU, else CPU."""
+    if query_embs.is_cuda:
+        return query_embs.device
+    if torch.cuda.is_available():
+        return torch.device("cuda")
+    return query_embs.device
+
+
+def compute_max_sim_batch(
+    query_embs: torch.Tensor,
+    doc_embs: List[np.ndarray],
+) -> np.ndarray:
+    """
+    Compute MaxSim scores for many documents with a single matrix multiply.
+
+    All document patches are stacked into one (sum_patches, 128) matrix so the
+    similarity matrix is produced by one large GEMM instead of one small matmul
+    per candidate, then reduced per document segment (max over patches, sum
+    over query tokens).
+
+    Torch query embeddings are scored with torch on the GPU when one is
+    available (CPU torch otherwise), with the GEMM run in the precision set by
+    search.rerank_dtype. float32 scoring on CPU uses a fused numba kernel when
+    numba is installed, and numpy otherwise.
+
+    Args:
+        query_embs: Query token embeddings, shape (num_query_tokens, 128)
+        doc_embs: Document patch embeddings, each of shape (num_patches, 128)
+
+    Returns:
+        np.ndarray: MaxSim score per document (0.0 for documents without patches)
+    """
+    scores = np.zeros(len(doc_embs), dtype=np.float32)
+    non_empty = [i for i, d in enumerate(doc_embs) if d.size > 0]
+    if not non_empty:
+        return scores
+
+    docs = [doc_embs[i] for i in non_empty]
+    stacked = np.concatenate(docs, axis=0)
+    patch_counts = [d.shape[0] for d in docs]
+
+    use_torch = isinstance(query_embs, torch.Tensor)
+    if use_torch:
+        device = _rerank_device(query_embs)
+        dtype = _rerank_dtype()
+        # float32 on CPU is handled by the fused numba kernel when available
+        use_torch = not (
+            _max_sim_segments is not None
+            and device.type == "cpu"
+            and dtype == torch.float32
+        )
+
+    if use_torch:
+        q_t = query_embs.detach().to(device=device, dtype=dtype)
+        docs_t = torch.from_numpy(stacked).to(device, non_blocking=True).to(dtype)
+        # (sum_patches, num_query_tokens) so segments run along dim 0;
+        # accumulate the reduction in float32 regardless of GEMM precision
+        similarities = (docs_t @ q_t.T).float()
+        max_per_token = torch.segment_reduce(
+            similarities,
+            "max",
+            lengths=torch.tensor(patch_counts, device=device),
+            axis=0,
+        )
+        scores[non_empty] = max_per_token.sum(dim=1).cpu().numpy()
+    else:
+        q_emb = _query_to_numpy(query_embs)
+        offsets = np.cumsum([0] + patch_counts)
+        if _max_sim_segments is not None:
+            # Fused kernel: no (num_query_tokens, sum_patches) intermediate
+            scores[non_empty] = _max_sim_segments(
+                np.ascontiguousarray(q_emb), np.ascontiguousarray(stacked), offsets
+            )
+        else:
+            # (num_query_tokens, sum_patches) similarity matrix in one GEMM
+            similarities = q_emb @ stacked.T
+            max_per_token = np.maximum.reduceat(similarities, offsets[:-1], axis=1)
+            scores[non_empty] = max_per_token.sum(axis=0)
+
+    return scores
+
+
 def rerank_results(
     query_embs: torch.Tensor,
     results: List[Dict[str, Any]],
@@ -131,8 +405,14 @@ def rerank_results(
     """
     Rerank search results using application-level MaxSim computation.
 
-    Prefers float embeddings for maximum precision, falls back to binary
-    embeddings if float embeddings are not available.
+    Prefers float embeddings for maximum precision (taken from the packed
+    embedding store when configured and it holds the document's current
+    content), falls back to
+    binary embeddings if float embeddings are not available. With
+    search.binary_hamming_rerank enabled and every embedded candidate
+    binary-only, documents are scored by popcount against a binarized query
+    instead of being unpacked to float. Popcount scores are sign-vs-sign dot
+    products on a different scale, so any float candidate disables the fast path.
 
     Args:
         query_embs: Query token embeddings from ColPali processor
@@ -148,40 +428,84 @@ def rerank_results(
     if not results:
         return results
 
-    scored_results = []
+    # Nothing to score against (e.g. an empty query string): keep Vespa's order
+    if query_embs is None or len(query_embs) == 0:
+        return results
 
-    for result in results:
+    # Parse all embeddings first so MaxSim can be computed in one batch
+    doc_embs = []
+    embedded_indices = []
+    use_hamming = get("search", "binary_hamming_rerank")
+    cache_dir = get("search", "embedding_cache_dir")
+    cache_dir = Path(cache_dir) if cache_dir else None
+    cache_version = get("search", "embedding_cache_version")
+    store = get_embedding_store()
+    binary_cells = []
+    binary_indices = []
+
+    for i, result in enumerate(results):
         fields = result.get("fields", {})
 
         # Prefer float embeddings for maximum precision
         float_embedding = fields.get(float_embedding_field)
         binary_embedding = fields.get(binary_embedding_field)
-
-        if float_embedding is not None:
+        # Only trusted when packed from the same content Vespa just returned
+        stored_embedding = (
+            store.get(fields.get("id", ""), embedding_fingerprint(float_embedding))
+            if store is not None and float_embedding is not None
+            else None
+        )
+
+        if stored_embedding is not None:
+            # Slice of the packed mmap store: no parsing at all
+            doc_embs.append(stored_embedding)
+            embedded_indices.append(i)
+        elif float_embedding is not None:
             # Use full-precision float embeddings
-            doc_emb = parse_float_embedding(float_embedding)
-            score = compute_max_sim(query_embs, doc_emb)
+            doc_embs.append(
+                load_float_embedding(fields.get("id", ""), float_embedding, cache_dir, cache_version)
+            )
+            embedded_indices.append(i)
         elif binary_embedding is not None:
-            # Fallback to unpacked binary embeddings
-            doc_emb = unpack_binary_embedding(binary_embedding)
-            score = compute_max_sim(query_embs, doc_emb)
-        else:
-            # No embedding data, keep original relevance score
-            score = result.get("relevance", 0.0)
+            # Scored once the whole candidate set is known
+            binary_cells.append(binary_embedding)
+            binary_indices.append(i)
+
+    use_hamming = use_hamming and bool(binary_cells) and not doc_embs
+    if not use_hamming:
+        # Fallback to unpacked binary embeddings, on the same scale as float ones
+        doc_embs.extend(unpack_binary_embedding(cells) for cells in binary_cells)
+        embedded_indices.extend(binary_indices)
+
+    batch_scores = compute_max_sim_batch(query_embs, doc_embs)
+    # No embedding data: keep original relevance score
+    scores = [result.get("relevance", 0.0) for result in results]
+    for i, score in zip(embedded_indices, batch_scores):
+        scores[i] = float(score)
+
+    if use_hamming:
+        # Every candidate is binary-only: popcount scoring on the packed bits
+        query_bits = binarize_query(query_embs)
+        for i, cells in zip(binary_indices, binary_cells):
+            scores[i] = compute_max_sim_binary(query_bits, pack_binary_embedding(cells))
+
+    reranked = []
+
+    for result, score in zip(results, scores):
+        fields = result.get("fields", {})
 
-        # Store the rerank score
+        # Store the rerank score on shallow copies so callers' results are untouched
         result_copy = result.copy()
-        result_copy["fields"] = fields.copy()
-        result_copy["fields"]["rerank_score"] = score
+        result_copy["fields"] = {**fields, "rerank_score": score}
         result_copy["original_relevance"] = result.get("relevance", 0.0)
         result_copy["relevance"] = score
 
-        scored_results.append((score, result_copy))
+        reranked.append(result_copy)
 
-    # Sort by score descending
-    scored_results.sort(key=lambda x: x[0], reverse=True)
+    # Sort by score descending in C; stable so ties keep their retrieval order
+    order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")
 
-    return [r for _, r in scored_results]
+    return [reranked[i] for i in order]
 
 
 def rerank_with_processor(
@@ -2,34 +2,95 @@
 S3 presigned URL generation for original PDF downloads.
 
 Provides a lazy-initialized boto3 client and a function to generate
-time-limited presigned download URLs from S3 object keys.
+time-limited presigned download URLs from S3 object keys. Generated URLs are
+cached per key and reused for the first half of their validity.
 """
 
 import os
+import re
+import time
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import quote
 
+from backend.cache import LRUCache
 from backend.config import get
 from backend.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 _s3_client = None
+# Credentials of the session _s3_client was built from, for direct signing
+_s3_credentials = None
+
+# (bucket, key) -> (url, reuse_until); URLs are handed out only while at least
+# half of their validity remains
+_url_cache = LRUCache(max_size=get("s3", "url_cache_size"))
 
 
 def _get_s3_client():
     """Lazy-initialize and return the boto3 S3 client singleton."""
-    global _s3_client
+    global _s3_client, _s3_credentials
     if _s3_client is None:
         import boto3
 
-        _s3_client = boto3.client(
-            "s3",
+        session = boto3.Session(
             aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
             aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
             region_name=os.environ.get("AWS_REGION", get("ingestion", "files", "s3_default_region")),
         )
+        _s3_client = session.client("s3")
+        _s3_credentials = session.get_credentials()
     return _s3_client
 
 
+# Buckets addressable as https://{bucket}.s3.{region}.amazonaws.com
+_VIRTUAL_HOST_BUCKET_RE = re.compile(r"^[a-z0-9][a-z0-9-]{1,61}[a-z0-9]$")
+
+
+def _presign_direct(client, credentials, bucket: str, s3_key: str, expiry: int) -> Optional[str]:
+    """Sign a GET URL with SigV4 query auth directly, skipping boto3's presign path.
+
+    boto3's generate_presigned_url spends most of its time on endpoint
+    resolution and request middleware rather than signing. For plain AWS S3
+    the URL is fully determined by bucket, region and key, so it is built by
+    hand and signed with botocore's S3SigV4QueryAuth.
+
+    Args:
+        client: S3 client, used for its region and endpoint
+        credentials: botocore credentials of the session the client was built from
+
+    Returns:
+        The presigned URL, or None when the direct path does not apply
+        (custom endpoint, non-DNS-compatible bucket, missing credentials).
+    """
+    from botocore.auth import S3SigV4QueryAuth
+    from botocore.awsrequest import AWSRequest
+    from botocore.credentials import Credentials
+
+    region = client.meta.region_name
+    if (
+        not isinstance(credentials, Credentials)
+        or not region
+        or not str(client.meta.endpoint_url).endswith(".amazonaws.com")
+        or not _VIRTUAL_HOST_BUCKET_RE.match(bucket)
+    ):
+        return None
+
+    request = AWSRequest(
+        method="GET",
+        url=f"https://{bucket}.s3.{region}.amazonaws.com/{quote(s3_key, safe='/~')}",
+    )
+    S3SigV4QueryAuth(credentials, "s3", region, expires=expiry).add_auth(request)
+    return request.url
+
+
+@lru_cache(maxsize=1)
+def _get_default_bucket() -> str:
+    """Resolve the default bucket once: S3_BUCKET env var, else config default."""
+    return os.environ.get("S3_BUCKET", get("ingestion", "files", "s3_default_bucket"))
+
+
 def generate_presigned_url(s3_key: str, bucket: str | None = None) -> str:
     """Generate a temporary presigned URL for downloading an S3 object.
 
@@ -47,15 +108,22 @@ def generate_presigned_url(s3_key: str, bucket: str | None = None) -> str:
         raise ValueError("s3_key must be a non-empty string")
 
     if bucket is None:
-        bucket = os.environ.get("S3_BUCKET", get("ingestion", "files", "s3_default_bucket"))
+        bucket = _get_default_bucket()
+
+    cached = _url_cache.get((bucket, s3_key))
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[0]
 
     expiry = get("s3", "presigned_url_expiry_seconds")
     client = _get_s3_client()
 
-    url = client.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": bucket, "Key": s3_key},
-        ExpiresIn=expiry,
-    )
+    url = _presign_direct(client, _s3_credentials, bucket, s3_key, expiry)
+    if url is None:
+        url = client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": s3_key},
+            ExpiresIn=expiry,
+        )
+    _url_cache.set((bucket, s3_key), (url, time.monotonic() + expiry / 2))
     logger.debug(f"Generated presigned URL for s3://{bucket}/{s3_key}")
     return url
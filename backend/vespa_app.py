@@ -9,6 +9,7 @@ from dotenv import load_dotenv
 from vespa.application import Vespa
 from vespa.io import VespaQueryResponse
 from .colpali import SimMapGenerator
+from .rerank import rerank_results
 import backend.stopwords
 
 from backend.config import get
@@ -260,13 +261,12 @@ class VespaQueryClient:
         Returns:
             Dict[str, Any]: The query results.
         """
-        from .rerank import rerank_results
-
         # Remove stopwords from the query to avoid visual emphasis on irrelevant words (e.g., "the", "and", "of")
         query = backend.stopwords.filter(query)
 
-        rank_method = ranking.split("_")[0]
-        sim_map: bool = len(ranking.split("_")) > 1 and ranking.split("_")[1] == "sim"
+        # "<method>" or "<method>_sim": parse once instead of splitting per check
+        rank_method, _, rank_suffix = ranking.partition("_")
+        sim_map: bool = rank_suffix.partition("_")[0] == "sim"
 
         # Determine hits to fetch - more if reranking
         hits_to_fetch = rerank_hits if rerank else final_hits
@@ -354,12 +354,29 @@ class VespaQueryClient:
         Returns:
             str: The full image data.
         """
+        return await self._get_image_field_from_vespa(doc_id, "full_image")
+
+    async def get_blur_image_from_vespa(self, doc_id: str) -> str:
+        """
+        Retrieve the blurred thumbnail from Vespa for a given document ID.
+
+        Args:
+            doc_id (str): The document ID.
+
+        Returns:
+            str: The base64 blur image data.
+        """
+        return await self._get_image_field_from_vespa(doc_id, "blur_image")
+
+    async def _get_image_field_from_vespa(self, doc_id: str, field: str) -> str:
+        # doc_id is interpolated into a YQL string literal
+        doc_id = doc_id.replace("\\", "\\\\").replace('"', '\\"')
         connection_count = get("vespa", "connection_count")
         async with self.app.asyncio(connections=connection_count) as session:
             start = time.perf_counter()
             response: VespaQueryResponse = await session.query(
                 body={
-                    "yql": f'select full_image from {self.VESPA_SCHEMA_NAME} where id contains "{doc_id}"',
+                    "yql": f'select {field} from {self.VESPA_SCHEMA_NAME} where id contains "{doc_id}"',
                     "ranking": "unranked",
                     "presentation.timing": True,
                     "ranking.matching.numThreadsPerSearch": 1,
@@ -368,10 +385,10 @@ class VespaQueryClient:
             assert response.is_successful(), response.json
             stop = time.perf_counter()
             self.logger.debug(
-                f"Getting image from Vespa took: {stop - start} s, Vespa reported searchtime was "
+                f"Getting {field} from Vespa took: {stop - start} s, Vespa reported searchtime was "
                 f"{response.json.get('timing', {}).get('searchtime', -1)} s"
             )
-        return response.json["root"]["children"][0]["fields"]["full_image"]
+        return response.json["root"]["children"][0]["fields"][field]
 
     def get_results_children(self, result: VespaQueryResponse) -> list:
         return result["root"]["children"]
@@ -5,12 +5,15 @@ Provides JSON REST APIs for the Next.js frontend.
 """
 import asyncio
 import base64
+import hashlib
 import io
 import json
 import os
+import re
 import time
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import quote
 
 import httpx
 import uvicorn
@@ -18,10 +21,12 @@ from fastcore.parallel import threaded
 from PIL import Image
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
-from starlette.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import FileResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from starlette.routing import Route
 from vespa.application import Vespa
 
+from backend.cache import LRUCache
 from backend.config import get
 from backend.logging_config import configure_logging, get_logger
 from backend.middleware import CorrelationIdMiddleware, ErrorBoundaryMiddleware
@@ -30,7 +35,9 @@ from backend.colpali import SimMapGenerator
 from backend.vespa_app import VespaQueryClient
 from backend.ingest import ingest_pdf, validate_pdf
 from backend.s3 import generate_presigned_url
+from backend.agent import close_http_session
 from backend.llm_rerank import llm_rerank_results, is_llm_rerank_enabled, get_llm_rerank_candidates
+from backend.rerank import warm_up_max_sim_kernel
 
 # Initialize centralized logging
 LOG_LEVEL = get("app", "log_level").upper()
@@ -53,7 +60,27 @@ SIM_MAP_DIR = Path(get("app", "sim_map_dir"))
 os.makedirs(IMG_DIR, exist_ok=True)
 os.makedirs(SIM_MAP_DIR, exist_ok=True)
 
+# Static files are named by doc id or query id and never rewritten in place
+STATIC_CACHE_CONTROL = f"public, max-age={get('app', 'static_cache_max_age_seconds')}"
+# Thumbnail URLs carry a hash of the image (v=...), so a versioned URL's content
+# never changes; unversioned or outdated URLs are revalidated against the ETag
+THUMB_CACHE_CONTROL = "public, max-age=31536000, immutable"
+THUMB_REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
 MAX_FILE_SIZE = get("app", "max_file_size_mb") * 1024 * 1024
+# Request bodies above this are rejected from Content-Length before the multipart
+# parser spools them; the slack covers form fields and multipart boundaries
+MAX_UPLOAD_BODY_SIZE = MAX_FILE_SIZE + 1024 * 1024
+
+# Autocomplete limits: short prefixes skip the Vespa round trip entirely
+AUTOCOMPLETE_MIN_CHARS = get("autocomplete", "min_chars")
+AUTOCOMPLETE_MAX_ITEMS = get("autocomplete", "max_items")
+
+# In-memory cache: doc_id -> (base64 blur image, content hash), filled from search results for /api/thumb
+_thumb_cache = LRUCache(max_size=get("image", "thumb_cache_size"))
+
+# In-memory cache: query_id -> result doc ids, so /get-message needs only the query_id
+_query_doc_ids = LRUCache(max_size=get("search", "query_doc_ids_cache_size"))
 
 # In-memory cache: query_id -> list of doc metadata dicts for chat grounding
 _query_result_metadata: dict[str, list[dict]] = {}
@@ -67,6 +94,50 @@ def generate_query_id(query: str, ranking_value: str) -> int:
     return hash(hash_input)
 
 
+# Characters no doc id contains; rejected before a doc id reaches a YQL string
+_INVALID_DOC_ID_RE = re.compile(r'["\\\x00-\x1f]')
+
+
+def parse_doc_ids(raw: str) -> list[str]:
+    """Split a comma-separated doc_ids parameter, dropping blanks and duplicates in order."""
+    return list(dict.fromkeys(d for d in (d.strip() for d in raw.split(",")) if d))
+
+
+def file_too_large_response() -> JSONResponse:
+    """Upload error for files over the configured MAX_FILE_SIZE."""
+    return JSONResponse(
+        {"success": False, "error": f"File exceeds {MAX_FILE_SIZE // (1024 * 1024)}MB size limit"},
+        status_code=400,
+    )
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header (comma-separated, weak or strong) matches etag."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+def thumb_hash(blur_image: str) -> str:
+    """Content hash of a base64 blur image, used as its URL version and ETag."""
+    return hashlib.md5(blur_image.encode("utf-8")).hexdigest()
+
+
+def thumb_url(fields: dict) -> str:
+    """Cache a result's blur image and return the versioned URL that serves it ("" if none)."""
+    doc_id = fields.get("id", "")
+    blur_image = fields.get("blur_image", "")
+    if not doc_id or not blur_image:
+        return ""
+    version = thumb_hash(blur_image)
+    _thumb_cache.set(doc_id, (blur_image, version))
+    return f"/api/thumb?doc_id={quote(doc_id)}&v={version}"
+
+
 # =============================================================================
 # Startup/shutdown handlers
 # =============================================================================
@@ -76,9 +147,16 @@ async def startup():
     global sim_map_generator
     sim_map_generator = SimMapGenerator(logger=logger)
     asyncio.create_task(poll_vespa_keepalive())
+    # JIT the rerank kernel in the background instead of on the first search
+    asyncio.create_task(asyncio.to_thread(warm_up_max_sim_kernel))
     logger.info("Application startup complete")
 
 
+async def shutdown():
+    """Close pooled HTTP clients."""
+    await close_http_session()
+
+
 async def poll_vespa_keepalive():
     """Background task to keep Vespa connection alive."""
     while True:
@@ -153,16 +231,16 @@ def _download_images_bg(doc_ids):
 async def serve_static(request):
     """Serve static files."""
     filepath = request.path_params.get("filepath", "")
-    return FileResponse(STATIC_DIR / filepath)
+    return FileResponse(STATIC_DIR / filepath, headers={"Cache-Control": STATIC_CACHE_CONTROL})
 
 
 async def api_suggestions(request):
     """Endpoint to get suggestions as user types in the search box."""
     query = request.query_params.get("query", "").lower().strip()
-    if query:
+    if query and len(query) >= AUTOCOMPLETE_MIN_CHARS:
         suggestions = await vespa_app.get_suggestions(query)
         if len(suggestions) > 0:
-            return JSONResponse({"suggestions": suggestions})
+            return JSONResponse({"suggestions": suggestions[:AUTOCOMPLETE_MAX_ITEMS]})
     return JSONResponse({"suggestions": []})
 
 
@@ -170,7 +248,7 @@ async def api_search(request):
     """JSON search endpoint for the Next.js frontend.
 
     Accepts JSON body: { query, ranking? }
-    Returns JSON with search results including blur images and doc IDs.
+    Returns JSON with search results including thumbnail URLs and doc IDs.
     """
     try:
         body = await request.json()
@@ -204,6 +282,7 @@ async def api_search(request):
 
     # Trigger background sim map + image download
     doc_ids = [r["fields"]["id"] for r in search_results]
+    _query_doc_ids.set(str(query_id), doc_ids)
     get_and_store_sim_maps(
         query_id=query_id,
         query=query,
@@ -227,7 +306,7 @@ async def api_search(request):
             "page_number": fields.get("page_number", 0),
             "snippet": fields.get("snippet", ""),
             "text": fields.get("text", ""),
-            "blur_image": fields.get("blur_image", ""),
+            "blur_image_url": thumb_url(fields),
             "relevance": relevance,
             "url": fields.get("url", ""),
             "has_original_pdf": bool(fields.get("s3_key", "")),
@@ -248,7 +327,7 @@ async def api_visual_search(request):
     """JSON endpoint for visual search results.
 
     Accepts JSON body: { query, ranking?, limit? }
-    Returns JSON with search results including blur images, doc IDs, and token map.
+    Returns JSON with search results including thumbnail URLs, doc IDs, and token map.
     """
     try:
         body = await request.json()
@@ -283,6 +362,7 @@ async def api_visual_search(request):
 
     # Trigger background sim map + image download
     doc_ids = [r["fields"]["id"] for r in search_results]
+    _query_doc_ids.set(str(query_id), doc_ids)
     get_and_store_sim_maps(
         query_id=query_id,
         query=query,
@@ -301,8 +381,8 @@ async def api_visual_search(request):
             "doc_id": r["fields"].get("id", ""),
             "title": r["fields"].get("title", "Unknown"),
             "page_number": r["fields"].get("page_number", 0) + 1,
-            "snippet": (r["fields"].get("snippet", "") or "")[:get("image", "truncation", "snippet_length")],
-            "text": (r["fields"].get("text", "") or "")[:get("image", "truncation", "text_length")],
+            "snippet": (r["fields"].get("snippet") or "")[:get("image", "truncation", "snippet_length")],
+            "text": (r["fields"].get("text") or "")[:get("image", "truncation", "text_length")],
         }
         for r in search_results
     ]
@@ -324,7 +404,7 @@ async def api_visual_search(request):
             "page_number": fields.get("page_number", 0),
             "snippet": fields.get("snippet", ""),
             "text": fields.get("text", ""),
-            "blur_image": fields.get("blur_image", ""),
+            "blur_image_url": thumb_url(fields),
             "relevance": relevance,
             "url": fields.get("url", ""),
             "has_original_pdf": bool(fields.get("s3_key", "")),
@@ -359,6 +439,41 @@ async def api_full_image(request):
     return JSONResponse({"image": f"data:image/jpeg;base64,{image_data}"})
 
 
+async def api_thumb(request):
+    """Serve a result's blurred thumbnail as a browser-cacheable JPEG.
+
+    URLs from thumb_url carry the image hash and are cached for a year;
+    without a matching v the response must be revalidated by ETag.
+    """
+    doc_id = request.query_params.get("doc_id", "")
+    if not doc_id:
+        return JSONResponse({"error": "doc_id is required"}, status_code=400)
+    if _INVALID_DOC_ID_RE.search(doc_id):
+        return JSONResponse({"error": "Invalid doc_id"}, status_code=400)
+
+    cached = _thumb_cache.get(doc_id)
+    if cached is None:
+        try:
+            blur_image = await vespa_app.get_blur_image_from_vespa(doc_id)
+        except (AssertionError, IndexError, KeyError):
+            return JSONResponse({"error": "Thumbnail not found"}, status_code=404)
+        cached = (blur_image, thumb_hash(blur_image))
+        _thumb_cache.set(doc_id, cached)
+    blur_image, version = cached
+
+    # Derived from the image itself, so a re-ingested page gets a new URL and ETag
+    cache_control = (
+        THUMB_CACHE_CONTROL
+        if request.query_params.get("v") == version
+        else THUMB_REVALIDATE_CACHE_CONTROL
+    )
+    etag = f'"{version}"'
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(base64.b64decode(blur_image), media_type="image/jpeg", headers=headers)
+
+
 async def api_sim_map(request):
     """JSON endpoint to get a similarity map image as base64.
 
@@ -391,6 +506,11 @@ async def api_upload(request):
     Returns JSON: {"success": true, "title": "...", "pages_indexed": N}
     On error: {"success": false, "error": "message"}
     """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_UPLOAD_BODY_SIZE:
+        logger.warning(f"Upload rejected before reading: Content-Length {content_length} bytes")
+        return file_too_large_response()
+
     form = await request.form()
     pdf_file = form.get("pdf_file")
     title = form.get("title", "")
@@ -414,7 +534,7 @@ async def api_upload(request):
     # Validate file size
     if len(file_bytes) > MAX_FILE_SIZE:
         logger.warning(f"File too large: {len(file_bytes)} bytes")
-        return JSONResponse({"success": False, "error": "File exceeds 250MB size limit"}, status_code=400)
+        return file_too_large_response()
 
     # Validate file is a PDF
     if not pdf_file.filename.lower().endswith(".pdf"):
@@ -428,8 +548,9 @@ async def api_upload(request):
 
     # Parse tags
     tag_list = []
-    if tags and tags.strip():
-        tag_list = [t.strip() for t in tags.split(",") if t.strip()]
+    if tags:
+        tag_list = [t for t in (t.strip() for t in tags.split(",")) if t]
+    if tag_list:
         max_tags = get("app", "validation", "max_tags")
         if len(tag_list) > max_tags:
             return JSONResponse({"success": False, "error": f"Maximum {max_tags} tags allowed"}, status_code=400)
@@ -438,7 +559,8 @@ async def api_upload(request):
             if len(tag) > max_tag_length:
                 return JSONResponse({"success": False, "error": f"Each tag must be {max_tag_length} characters or less"}, status_code=400)
 
-    # Validate title length
+    # Validate title length (stripped once; reused for ingestion and the response)
+    title = title.strip() if title else ""
     max_title_length = get("app", "validation", "max_title_length")
     if title and len(title) > max_title_length:
         return JSONResponse({"success": False, "error": f"Title must be {max_title_length} characters or less"}, status_code=400)
@@ -468,7 +590,7 @@ async def api_upload(request):
             model=model,
             processor=processor,
             device=device,
-            title=title.strip() if title and title.strip() else None,
+            title=title or None,
             description=description if description else "",
             tags=tag_list,
             detect_drawing_regions=enable_regions,
@@ -479,7 +601,7 @@ async def api_upload(request):
         return JSONResponse({"success": False, "error": "Error processing document. Please try again."}, status_code=500)
 
     if success:
-        final_title = title.strip() if title and title.strip() else Path(pdf_file.filename).stem
+        final_title = title or Path(pdf_file.filename).stem
         logger.info(f"Successfully uploaded: {final_title} ({pages_indexed} pages)")
         return JSONResponse({
             "success": True,
@@ -578,7 +700,11 @@ async def api_download_pdf(request):
 # =============================================================================
 
 async def message_generator(query_id: str, query: str, doc_ids: list):
-    """Generator function to yield SSE messages for chat response."""
+    """Generator function to yield SSE messages for chat response.
+
+    "message" events replace the displayed text (status and errors); "delta"
+    events carry only the newly generated answer text, to be appended.
+    """
     images = []
     num_images = get("search", "num_images")
     max_wait = get("image", "max_wait_chat_seconds")
@@ -644,7 +770,6 @@ async def message_generator(query_id: str, query: str, doc_ids: list):
 
     headers = build_auth_headers(LLM_API_KEY)
 
-    response_text = ""
     try:
         async with httpx.AsyncClient(timeout=get("llm", "http_timeout_seconds")) as client:
             async with client.stream(
@@ -672,8 +797,7 @@ async def message_generator(query_id: str, query: str, doc_ids: list):
                         delta = chunk["choices"][0].get("delta", {})
                         text = delta.get("content", "")
                         if text:
-                            response_text += text
-                            yield f"event: message\ndata: {replace_newline_with_br(response_text)}\n\n"
+                            yield f"event: delta\ndata: {replace_newline_with_br(text)}\n\n"
                             await asyncio.sleep(get("llm", "streaming_sleep_seconds"))
                     except (json.JSONDecodeError, KeyError, IndexError):
                         continue
@@ -683,11 +807,24 @@ async def message_generator(query_id: str, query: str, doc_ids: list):
     yield "event: close\ndata: \n\n"
 
 
+async def expired_results_generator():
+    """SSE stream telling the client its search results are no longer cached."""
+    yield "event: message\ndata: Search results expired, please search again.\n\n"
+    yield "event: close\ndata: \n\n"
+
+
 async def get_message(request):
-    """SSE endpoint for chat responses."""
+    """SSE endpoint for chat responses.
+
+    doc_ids is optional: without it the result ids cached for query_id are used.
+    """
     query_id = request.query_params.get("query_id", "")
     query = request.query_params.get("query", "")
-    doc_ids = request.query_params.get("doc_ids", "").split(",")
+    doc_ids = parse_doc_ids(request.query_params.get("doc_ids", "")) or _query_doc_ids.get(query_id)
+    if doc_ids is None:
+        # Evicted, restarted, or served by another worker: the ids can't be recovered
+        logger.info(f"No cached doc ids for query_id: {query_id}")
+        return StreamingResponse(expired_results_generator(), media_type="text/event-stream")
     return StreamingResponse(
         message_generator(query_id=query_id, query=query, doc_ids=doc_ids),
         media_type="text/event-stream",
@@ -695,7 +832,10 @@ async def get_message(request):
 
 
 async def synthesize_generator(query: str, doc_ids: list, query_id: str):
-    """Generator function to yield SSE messages for synthesis response."""
+    """Generator function to yield SSE messages for synthesis response.
+
+    Uses the same "message" (replace) / "delta" (append) events as message_generator.
+    """
     images = []
     num_images = min(len(doc_ids), get("search", "num_images"))
     max_wait = get("image", "max_wait_chat_seconds")
@@ -762,7 +902,6 @@ async def synthesize_generator(query: str, doc_ids: list, query_id: str):
 
     headers = build_auth_headers(LLM_API_KEY)
 
-    response_text = ""
     try:
         async with httpx.AsyncClient(timeout=get("llm", "http_timeout_seconds")) as client:
             async with client.stream(
@@ -790,8 +929,7 @@ async def synthesize_generator(query: str, doc_ids: list, query_id: str):
                         delta = chunk["choices"][0].get("delta", {})
                         text = delta.get("content", "")
                         if text:
-                            response_text += text
-                            yield f"event: message\ndata: {replace_newline_with_br(response_text)}\n\n"
+                            yield f"event: delta\ndata: {replace_newline_with_br(text)}\n\n"
                             await asyncio.sleep(get("llm", "streaming_sleep_seconds"))
                     except (json.JSONDecodeError, KeyError, IndexError):
                         continue
@@ -805,8 +943,7 @@ async def api_synthesize(request):
     """SSE endpoint for synthesizing an AI answer from selected documents."""
     query_id = request.query_params.get("query_id", "")
     query = request.query_params.get("query", "")
-    doc_ids = request.query_params.get("doc_ids", "")
-    doc_id_list = [d.strip() for d in doc_ids.split(",") if d.strip()]
+    doc_id_list = parse_doc_ids(request.query_params.get("doc_ids", ""))
     return StreamingResponse(
         synthesize_generator(query=query, doc_ids=doc_id_list, query_id=query_id),
         media_type="text/event-stream",
@@ -817,15 +954,26 @@ async def api_synthesize(request):
 # Application Setup
 # =============================================================================
 
+# Compress text-heavy JSON responses only: images are already compressed and
+# SSE streams must not be buffered by the encoder
+gzip_middleware = [
+    Middleware(
+        GZipMiddleware,
+        minimum_size=get("app", "gzip_minimum_size"),
+        compresslevel=get("app", "gzip_compresslevel"),
+    ),
+]
+
 routes = [
     # Static files
     Route("/static/{filepath:path}", serve_static),
 
     # JSON API endpoints
-    Route("/suggestions", api_suggestions),
-    Route("/api/search", api_search, methods=["POST"]),
-    Route("/api/visual-search", api_visual_search, methods=["POST"]),
+    Route("/suggestions", api_suggestions, middleware=gzip_middleware),
+    Route("/api/search", api_search, methods=["POST"], middleware=gzip_middleware),
+    Route("/api/visual-search", api_visual_search, methods=["POST"], middleware=gzip_middleware),
     Route("/api/full_image", api_full_image),
+    Route("/api/thumb", api_thumb),
     Route("/api/sim-map", api_sim_map),
     Route("/api/upload", api_upload, methods=["POST"]),
     Route("/api/download_url", api_download_url),
@@ -846,6 +994,7 @@ app = Starlette(
     routes=routes,
     middleware=middleware,
     on_startup=[startup],
+    on_shutdown=[shutdown],
 )
 
 # Alias for compatibility with existing uvicorn command
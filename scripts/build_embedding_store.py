@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Pack the per-document rerank embedding cache into one memory-mapped store.
+
+Usage:
+    python scripts/build_embedding_store.py
+    python scripts/build_embedding_store.py --cache-dir cache/embeddings --store-dir cache/store
+
+Requirements:
+    - search.embedding_cache_dir populated by reranking (or passed explicitly)
+    - Set search.embedding_store_dir to the output directory to use the store
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.config import get
+from backend.embedding_store import build_embedding_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the packed rerank embedding store")
+    parser.add_argument(
+        "--cache-dir",
+        default=get("search", "embedding_cache_dir"),
+        help="Per-document .npy embedding cache (default: search.embedding_cache_dir)",
+    )
+    parser.add_argument(
+        "--store-dir",
+        default=get("search", "embedding_store_dir"),
+        help="Output directory (default: search.embedding_store_dir)",
+    )
+    parser.add_argument(
+        "--version",
+        type=int,
+        default=get("search", "embedding_cache_version"),
+        help="Embedding version to pack (default: search.embedding_cache_version)",
+    )
+    args = parser.parse_args()
+
+    if not args.cache_dir or not args.store_dir:
+        parser.error("--cache-dir and --store-dir are required when not set in ki55.toml")
+
+    num_docs = build_embedding_store(Path(args.cache_dir), Path(args.store_dir), args.version)
+    print(f"Packed {num_docs} documents into {args.store_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -86,6 +86,10 @@ class TestShouldDetectRegions:
         img = _make_small_image()
         assert should_detect_regions(img, force=True)
 
+    def test_precomputed_pixel_count_is_used(self):
+        img = _make_small_image()
+        assert should_detect_regions(img, pixel_count=4000 * 3000)
+
 
 class TestDetectedRegion:
     def test_area(self):
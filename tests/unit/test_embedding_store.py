@@ -0,0 +1,74 @@
+"""Unit tests for backend.embedding_store packed embeddings."""
+
+import numpy as np
+
+import backend.embedding_store as store_mod
+from backend.embedding_store import (
+    EmbeddingStore,
+    build_embedding_store,
+    embedding_fingerprint,
+    get_embedding_store,
+)
+from backend.rerank import EMBEDDING_DIM, load_float_embedding
+
+
+def _float_cells(emb: np.ndarray) -> dict:
+    return {"blocks": {str(i): row.tolist() for i, row in enumerate(emb)}}
+
+
+def test_build_and_lookup(tmp_path):
+    rng = np.random.default_rng(0)
+    cache_dir = tmp_path / "cache"
+    docs = {
+        f"doc-{n}": rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+        for n in (3, 1, 5)
+    }
+    for doc_id, emb in docs.items():
+        load_float_embedding(doc_id, _float_cells(emb), cache_dir)
+
+    assert build_embedding_store(cache_dir, tmp_path / "store") == 3
+    store = EmbeddingStore.load(tmp_path / "store")
+
+    assert len(store) == 3
+    for doc_id, emb in docs.items():
+        fingerprint = embedding_fingerprint(_float_cells(emb))
+        np.testing.assert_array_equal(store.get(doc_id, fingerprint), emb)
+    assert store.get("missing", "") is None
+
+
+def test_changed_content_not_served(tmp_path):
+    emb = np.ones((2, EMBEDDING_DIM), dtype=np.float32)
+    load_float_embedding("doc-1", _float_cells(emb), tmp_path / "cache")
+    build_embedding_store(tmp_path / "cache", tmp_path / "store")
+    store = EmbeddingStore.load(tmp_path / "store")
+
+    assert store.get("doc-1", embedding_fingerprint(_float_cells(2 * emb))) is None
+
+
+def test_other_versions_not_packed(tmp_path):
+    emb = np.ones((2, EMBEDDING_DIM), dtype=np.float32)
+    load_float_embedding("doc-1", _float_cells(emb), tmp_path / "cache", version=1)
+
+    assert build_embedding_store(tmp_path / "cache", tmp_path / "store", version=2) == 0
+
+
+def test_store_ignored_on_version_mismatch(tmp_path, monkeypatch):
+    emb = np.ones((2, EMBEDDING_DIM), dtype=np.float32)
+    load_float_embedding("doc-1", _float_cells(emb), tmp_path / "cache", version=1)
+    build_embedding_store(tmp_path / "cache", tmp_path / "store", version=1)
+    assert EmbeddingStore.load(tmp_path / "store").version == 1
+
+    config = {
+        ("search", "embedding_store_dir"): str(tmp_path / "store"),
+        ("search", "embedding_cache_version"): 1,
+    }
+    monkeypatch.setattr(store_mod, "get", lambda *keys: config[keys])
+    get_embedding_store.cache_clear()
+    try:
+        assert len(get_embedding_store()) == 1
+
+        config[("search", "embedding_cache_version")] = 2
+        get_embedding_store.cache_clear()
+        assert get_embedding_store() is None
+    finally:
+        get_embedding_store.cache_clear()
@@ -0,0 +1,270 @@
+"""Unit tests for backend.rerank MaxSim reranking."""
+
+import numpy as np
+import pytest
+import torch
+
+import backend.rerank as rerank_mod
+from backend.rerank import (
+    EMBEDDING_DIM,
+    binarize_query,
+    compute_max_sim,
+    compute_max_sim_batch,
+    compute_max_sim_binary,
+    load_float_embedding,
+    pack_binary_embedding,
+    parse_float_embedding,
+    rerank_results,
+    unpack_binary_embedding,
+)
+
+
+def _float_cells(emb: np.ndarray) -> dict:
+    """Build Vespa float tensor cells from a (num_patches, dim) array."""
+    return {"blocks": {str(i): row.tolist() for i, row in enumerate(emb)}}
+
+
+def _binary_cells(emb: np.ndarray) -> dict:
+    """Build Vespa packed int8 tensor cells from a (num_patches, dim) array."""
+    packed = np.packbits(emb > 0, axis=1).astype(np.int8)
+    return {"blocks": {str(i): row.tolist() for i, row in enumerate(packed)}}
+
+
+class TestParseFloatEmbedding:
+    def test_empty_blocks(self):
+        assert parse_float_embedding({}).size == 0
+
+    def test_patches_sorted_numerically(self):
+        rng = np.random.default_rng(0)
+        emb = rng.standard_normal((12, EMBEDDING_DIM)).astype(np.float32)
+        cells = _float_cells(emb)
+        # Insert keys out of order ("10" sorts before "2" lexically)
+        cells["blocks"] = dict(reversed(list(cells["blocks"].items())))
+
+        parsed = parse_float_embedding(cells)
+
+        assert parsed.dtype == np.float32
+        np.testing.assert_array_equal(parsed, emb)
+
+
+class TestLoadFloatEmbedding:
+    def test_writes_then_reuses_cache(self, tmp_path, monkeypatch):
+        rng = np.random.default_rng(9)
+        emb = rng.standard_normal((3, EMBEDDING_DIM)).astype(np.float32)
+        cells = _float_cells(emb)
+
+        first = load_float_embedding("doc-1", cells, tmp_path)
+        # Cache hit must not parse the cells again
+        monkeypatch.setattr(rerank_mod, "parse_float_embedding", None)
+        second = load_float_embedding("doc-1", cells, tmp_path)
+
+        np.testing.assert_array_equal(first, emb)
+        np.testing.assert_array_equal(second, emb)
+        assert len(list(tmp_path.glob("*.npy"))) == 1
+
+    def test_version_change_misses_cache(self, tmp_path):
+        emb = np.ones((2, EMBEDDING_DIM), dtype=np.float32)
+        load_float_embedding("doc-1", _float_cells(emb), tmp_path, version=1)
+
+        load_float_embedding("doc-1", _float_cells(emb), tmp_path, version=2)
+
+        assert len(list(tmp_path.glob("*_v1_f.npy"))) == 1
+        assert len(list(tmp_path.glob("*_v2_f.npy"))) == 1
+
+    def test_reingested_content_replaces_cache_entry(self, tmp_path):
+        rng = np.random.default_rng(13)
+        old, new = (rng.standard_normal((4, EMBEDDING_DIM)).astype(np.float32) for _ in range(2))
+        load_float_embedding("doc-1", _float_cells(old), tmp_path)
+
+        reloaded = load_float_embedding("doc-1", _float_cells(new), tmp_path)
+
+        np.testing.assert_array_equal(reloaded, new)
+        assert len(list(tmp_path.glob("*.npy"))) == 1
+
+    def test_no_cache_dir_parses(self, tmp_path):
+        emb = np.ones((2, EMBEDDING_DIM), dtype=np.float32)
+
+        np.testing.assert_array_equal(load_float_embedding("doc-1", _float_cells(emb), None), emb)
+
+
+class TestUnpackBinaryEmbedding:
+    def test_empty_blocks(self):
+        assert unpack_binary_embedding({}).size == 0
+
+    def test_unpacks_to_signs(self):
+        rng = np.random.default_rng(1)
+        emb = rng.standard_normal((11, EMBEDDING_DIM)).astype(np.float32)
+
+        unpacked = unpack_binary_embedding(_binary_cells(emb))
+
+        np.testing.assert_array_equal(unpacked, np.where(emb > 0, 1.0, -1.0))
+
+
+class TestRerankResults:
+    def test_empty_results(self):
+        assert rerank_results(torch.zeros(3, EMBEDDING_DIM), []) == []
+
+    def test_orders_by_max_sim(self):
+        rng = np.random.default_rng(2)
+        q = rng.standard_normal((4, EMBEDDING_DIM)).astype(np.float32)
+        docs = [rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32) for n in (5, 9, 3)]
+        results = [
+            {"fields": {"id": f"doc{i}", "embedding_float": _float_cells(d)}, "relevance": 0.1}
+            for i, d in enumerate(docs)
+        ]
+
+        reranked = rerank_results(torch.from_numpy(q), results)
+
+        expected = sorted(
+            ((compute_max_sim(q, d), f"doc{i}") for i, d in enumerate(docs)),
+            reverse=True,
+        )
+        assert [r["fields"]["id"] for r in reranked] == [doc_id for _, doc_id in expected]
+        for r, (score, _) in zip(reranked, expected, strict=True):
+            assert np.isclose(r["relevance"], score, rtol=1e-5)
+            assert r["original_relevance"] == 0.1
+
+    def test_empty_query_keeps_original_order(self):
+        results = [{"fields": {"id": "a"}, "relevance": 0.1}, {"fields": {"id": "b"}, "relevance": 0.9}]
+
+        assert rerank_results(torch.zeros(0, EMBEDDING_DIM), results) is results
+
+    def test_result_without_embedding_keeps_relevance(self):
+        q = torch.ones(2, EMBEDDING_DIM)
+        results = [{"fields": {"id": "plain"}, "relevance": 0.42}]
+
+        reranked = rerank_results(q, results)
+
+        assert reranked[0]["relevance"] == 0.42
+        assert "embedding_float" not in results[0]["fields"]
+
+    @pytest.mark.parametrize("hamming", [False, True])
+    def test_mixed_float_and_binary_share_one_scale(self, monkeypatch, hamming):
+        config_get = rerank_mod.get
+        monkeypatch.setattr(
+            rerank_mod,
+            "get",
+            lambda *keys: hamming if keys == ("search", "binary_hamming_rerank") else config_get(*keys),
+        )
+        rng = np.random.default_rng(11)
+        q = rng.standard_normal((4, EMBEDDING_DIM)).astype(np.float32)
+        float_doc = rng.standard_normal((6, EMBEDDING_DIM)).astype(np.float32)
+        binary_doc = rng.standard_normal((6, EMBEDDING_DIM)).astype(np.float32)
+        binary_cells = _binary_cells(binary_doc)
+        results = [
+            {"fields": {"id": "float", "embedding_float": _float_cells(float_doc)}},
+            {"fields": {"id": "binary", "embedding": binary_cells}},
+        ]
+
+        reranked = rerank_results(torch.from_numpy(q), results)
+
+        scores = {r["fields"]["id"]: r["relevance"] for r in reranked}
+        assert np.isclose(scores["float"], compute_max_sim(q, float_doc), rtol=1e-5)
+        assert np.isclose(
+            scores["binary"], compute_max_sim(q, unpack_binary_embedding(binary_cells)), rtol=1e-5
+        )
+
+    def test_hamming_used_when_all_candidates_binary(self, monkeypatch):
+        config_get = rerank_mod.get
+        monkeypatch.setattr(
+            rerank_mod,
+            "get",
+            lambda *keys: True if keys == ("search", "binary_hamming_rerank") else config_get(*keys),
+        )
+        rng = np.random.default_rng(12)
+        q = rng.standard_normal((4, EMBEDDING_DIM)).astype(np.float32)
+        cells = _binary_cells(rng.standard_normal((6, EMBEDDING_DIM)).astype(np.float32))
+
+        reranked = rerank_results(torch.from_numpy(q), [{"fields": {"id": "b", "embedding": cells}}])
+
+        expected = compute_max_sim_binary(binarize_query(q), pack_binary_embedding(cells))
+        assert reranked[0]["relevance"] == expected
+
+
+class TestComputeMaxSim:
+    def test_single_patch(self):
+        rng = np.random.default_rng(10)
+        q = rng.standard_normal((3, EMBEDDING_DIM)).astype(np.float32)
+        doc = rng.standard_normal((1, EMBEDDING_DIM)).astype(np.float32)
+
+        assert np.isclose(compute_max_sim(q, doc), (q @ doc.T).sum(), rtol=1e-5)
+
+
+class TestComputeMaxSimBatch:
+    def test_matches_per_document_max_sim(self):
+        rng = np.random.default_rng(3)
+        q = torch.from_numpy(rng.standard_normal((6, EMBEDDING_DIM)).astype(np.float32))
+        docs = [
+            rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32) for n in (1, 7, 4)
+        ]
+        docs.insert(1, np.array([]))
+
+        scores = compute_max_sim_batch(q, docs)
+
+        expected = [compute_max_sim(q, d) for d in docs]
+        np.testing.assert_allclose(scores, expected, rtol=1e-5)
+        assert scores[1] == 0.0
+
+    def test_accepts_bfloat16_query(self):
+        rng = np.random.default_rng(4)
+        q = torch.from_numpy(rng.standard_normal((3, EMBEDDING_DIM)).astype(np.float32))
+        doc = rng.standard_normal((5, EMBEDDING_DIM)).astype(np.float32)
+
+        scores = compute_max_sim_batch(q.to(torch.bfloat16), [doc])
+
+        assert np.isclose(scores[0], compute_max_sim(q.to(torch.bfloat16), doc), rtol=1e-5)
+
+    def test_numpy_and_torch_paths_agree(self, monkeypatch):
+        # Without numba, CPU float32 torch queries take the torch path instead
+        # of the fused kernel
+        monkeypatch.setattr(rerank_mod, "_max_sim_segments", None)
+        rng = np.random.default_rng(5)
+        q = rng.standard_normal((4, EMBEDDING_DIM)).astype(np.float32)
+        docs = [rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32) for n in (3, 8)]
+
+        np.testing.assert_allclose(
+            compute_max_sim_batch(q, docs),
+            compute_max_sim_batch(torch.from_numpy(q), docs),
+            rtol=1e-5,
+        )
+
+    def test_bfloat16_gemm_close_to_float32(self, monkeypatch):
+        rng = np.random.default_rng(6)
+        q = torch.from_numpy(rng.standard_normal((4, EMBEDDING_DIM)).astype(np.float32))
+        docs = [rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32) for n in (6, 2)]
+        expected = compute_max_sim_batch(q, docs)
+
+        monkeypatch.setattr(rerank_mod, "_rerank_dtype", lambda: torch.bfloat16)
+
+        np.testing.assert_allclose(compute_max_sim_batch(q, docs), expected, rtol=5e-2)
+
+
+class TestComputeMaxSimBinary:
+    def test_matches_unpacked_dot_products(self):
+        rng = np.random.default_rng(7)
+        q = rng.standard_normal((5, EMBEDDING_DIM)).astype(np.float32)
+        doc = rng.standard_normal((9, EMBEDDING_DIM)).astype(np.float32)
+        cells = _binary_cells(doc)
+
+        score = compute_max_sim_binary(binarize_query(q), pack_binary_embedding(cells))
+
+        q_signs = np.where(q > 0, 1.0, -1.0).astype(np.float32)
+        assert score == compute_max_sim(q_signs, unpack_binary_embedding(cells))
+
+    def test_empty_doc(self):
+        q_bits = binarize_query(np.ones((2, EMBEDDING_DIM), dtype=np.float32))
+        assert compute_max_sim_binary(q_bits, pack_binary_embedding({})) == 0.0
+
+
+class TestNumbaKernel:
+    def test_matches_numpy_fallback(self, monkeypatch):
+        if rerank_mod._max_sim_segments is None:
+            pytest.skip("numba not installed")
+        rng = np.random.default_rng(8)
+        q = rng.standard_normal((4, EMBEDDING_DIM)).astype(np.float32)
+        docs = [rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32) for n in (2, 9, 5)]
+        fused = compute_max_sim_batch(q, docs)
+
+        monkeypatch.setattr(rerank_mod, "_max_sim_segments", None)
+
+        np.testing.assert_allclose(fused, compute_max_sim_batch(q, docs), rtol=1e-4)
@@ -1,19 +1,26 @@
 """Unit tests for backend.s3 presigned URL generation."""
 
+import datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from backend.s3 import generate_presigned_url
 import backend.s3 as s3_mod
+from backend.s3 import generate_presigned_url
 
 
 @pytest.fixture(autouse=True)
 def _reset_s3_client():
-    """Reset the module-level S3 client singleton between tests."""
+    """Reset the module-level S3 client singleton and caches between tests."""
     s3_mod._s3_client = None
+    s3_mod._s3_credentials = None
+    s3_mod._get_default_bucket.cache_clear()
+    s3_mod._url_cache.clear()
     yield
     s3_mod._s3_client = None
+    s3_mod._s3_credentials = None
+    s3_mod._get_default_bucket.cache_clear()
+    s3_mod._url_cache.clear()
 
 
 def test_generate_presigned_url_returns_url():
@@ -32,6 +39,75 @@ def test_generate_presigned_url_returns_url():
     )
 
 
+def test_generate_presigned_url_reuses_cached_url():
+    """Repeated calls for the same key reuse the URL instead of re-signing."""
+    mock_client = MagicMock()
+    mock_client.generate_presigned_url.return_value = "https://s3.example.com/signed"
+
+    with patch.object(s3_mod, "_get_s3_client", return_value=mock_client):
+        first = generate_presigned_url("path/to/file.pdf", bucket="test-bucket")
+        second = generate_presigned_url("path/to/file.pdf", bucket="test-bucket")
+
+    assert first == second
+    mock_client.generate_presigned_url.assert_called_once()
+
+
+def test_generate_presigned_url_regenerates_after_half_expiry():
+    """A cached URL is not reused once half its validity has passed."""
+    mock_client = MagicMock()
+    mock_client.generate_presigned_url.side_effect = ["https://s3/one", "https://s3/two"]
+
+    clock = MagicMock()
+    # First call stores at t=0; second call checks and re-stores past the 1800s reuse window
+    clock.monotonic.side_effect = [0.0, 1801.0, 1801.0]
+
+    with patch.object(s3_mod, "_get_s3_client", return_value=mock_client), \
+            patch.object(s3_mod, "time", clock):
+        assert generate_presigned_url("k.pdf", bucket="b") == "https://s3/one"
+        assert generate_presigned_url("k.pdf", bucket="b") == "https://s3/two"
+
+
+def test_direct_signing_matches_boto3_sigv4():
+    """Direct SigV4 signing produces the same URL as boto3's s3v4 presigner."""
+    import boto3
+    from botocore.config import Config
+
+    session = boto3.Session(
+        aws_access_key_id="AKIDEXAMPLE",
+        aws_secret_access_key="secret",
+        region_name="us-west-2",
+    )
+    client = session.client(
+        "s3", config=Config(signature_version="s3v4", s3={"addressing_style": "virtual"})
+    )
+    key = "project 1/drawings/a+b ü~.pdf"
+    fixed = datetime.datetime(2026, 1, 1)
+
+    # Both signers stamp requests through botocore.auth's get_current_datetime
+    with patch("botocore.auth.get_current_datetime", return_value=fixed):
+        expected = client.generate_presigned_url(
+            "get_object", Params={"Bucket": "my-bucket", "Key": key}, ExpiresIn=3600
+        )
+        direct = s3_mod._presign_direct(
+            client, session.get_credentials(), "my-bucket", key, 3600
+        )
+
+    assert direct == expected
+
+
+def test_direct_signing_skips_dotted_bucket():
+    """Buckets that cannot be virtual-hosted fall back to boto3."""
+    import boto3
+
+    session = boto3.Session(
+        aws_access_key_id="AKID", aws_secret_access_key="secret", region_name="us-west-2"
+    )
+    client = session.client("s3")
+    assert s3_mod._presign_direct(
+        client, session.get_credentials(), "my.bucket", "k.pdf", 3600
+    ) is None
+
+
 def test_generate_presigned_url_empty_key_raises():
     """generate_presigned_url raises ValueError for empty key."""
     with pytest.raises(ValueError, match="s3_key must be a non-empty string"):
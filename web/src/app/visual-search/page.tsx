@@ -1,18 +1,25 @@
 "use client";
 
-import { useState, useCallback } from "react";
+import { useState, useCallback, useMemo } from "react";
 import Link from "next/link";
+import dynamic from "next/dynamic";
 import { Search, ArrowRight, Sparkles, Layers } from "lucide-react";
 import { cn } from "@/lib/utils";
 import { useVisualSearch } from "@/hooks/use-visual-search";
 import { VisualSearchResultGrid } from "@/components/visual-search/result-grid";
 import { SelectionFooter } from "@/components/visual-search/selection-footer";
-import { AnswerPanel } from "@/components/visual-search/answer-panel";
-import { DocumentViewer } from "@/components/document/document-viewer";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import type { VisualSearchResult, SearchResult } from "@/types";
 
+// Only needed once the user opens a page or asks for an answer, so they load on first use
+const AnswerPanel = dynamic(() =>
+  import("@/components/visual-search/answer-panel").then((m) => m.AnswerPanel)
+);
+const DocumentViewer = dynamic(() =>
+  import("@/components/document/document-viewer").then((m) => m.DocumentViewer)
+);
+
 const SAMPLE_QUERIES = [
   "What percentage of funds were in real estate investments in 2023?",
   "Gender balance at level 4 or above in NY office?",
@@ -21,6 +28,45 @@ const SAMPLE_QUERIES = [
   "Proportion of female new hires 2021-2023?",
 ];
 
+// Static header: built once so React skips reconciling it on every keystroke
+const PAGE_HEADER = (
+  <header className="border-b border-[var(--border-primary)] bg-[var(--bg-secondary)]">
+    <div className="max-w-7xl mx-auto px-4 py-4 flex items-center justify-between">
+      <div className="flex items-center gap-3">
+        <div className="w-8 h-8 rounded-lg bg-gradient-to-br from-[#d97756] to-[#b85636] flex items-center justify-center">
+          <Layers className="h-4 w-4 text-white" />
+        </div>
+        <div>
+          <h1 className="text-lg font-semibold text-[var(--text-primary)]">Visual Search</h1>
+          <p className="text-xs text-[var(--text-tertiary)]">Search documents visually with ColPali</p>
+        </div>
+      </div>
+      <nav className="flex items-center gap-2">
+        <Link
+          href="/"
+          className={cn(
+            "h-8 px-3 text-xs inline-flex items-center justify-center font-medium rounded-[var(--radius-md)]",
+            "text-[var(--text-secondary)] hover:text-[var(--text-primary)] hover:bg-[var(--bg-tertiary)]",
+            "transition-all duration-[var(--transition-fast)]"
+          )}
+        >
+          Search
+        </Link>
+        <Link
+          href="/upload"
+          className={cn(
+            "h-8 px-3 text-xs inline-flex items-center justify-center font-medium rounded-[var(--radius-md)]",
+            "text-[var(--text-secondary)] hover:text-[var(--text-primary)] hover:bg-[var(--bg-tertiary)]",
+            "transition-all duration-[var(--transition-fast)]"
+          )}
+        >
+          Upload
+        </Link>
+      </nav>
+    </div>
+  </header>
+);
+
 export default function VisualSearchPage() {
   const {
     query,
@@ -82,61 +128,34 @@ export default function VisualSearchPage() {
   }, []);
 
   // Convert VisualSearchResult to SearchResult for DocumentViewer
-  const detailSearchResult: SearchResult | null = detailResult
-    ? {
-        id: detailResult.id,
-        documentId: detailResult.id,
-        title: detailResult.title,
-        pageNumber: detailResult.pageNumber,
-        snippet: detailResult.snippet,
-        relevanceScore: detailResult.relevance,
-        category: "other",
-        blurImage: detailResult.blurImage,
-        text: detailResult.text,
-      }
-    : null;
-
-  const selectedResults = results.filter((r) => selectedIds.has(r.id));
+  const detailSearchResult: SearchResult | null = useMemo(
+    () =>
+      detailResult
+        ? {
+            id: detailResult.id,
+            documentId: detailResult.id,
+            title: detailResult.title,
+            pageNumber: detailResult.pageNumber,
+            snippet: detailResult.snippet,
+            relevanceScore: detailResult.relevance,
+            category: "other",
+            blurImage: detailResult.blurImage,
+            text: detailResult.text,
+          }
+        : null,
+    [detailResult]
+  );
+
+  // Recomputed only when results or selection change, not on every query keystroke
+  const selectedResults = useMemo(
+    () => results.filter((r) => selectedIds.has(r.id)),
+    [results, selectedIds]
+  );
   const hasSearched = results.length > 0 || searchError !== null;
 
   return (
     <div className="min-h-screen bg-[var(--bg-primary)]">
-      {/* Header */}
-      <header className="border-b border-[var(--border-primary)] bg-[var(--bg-secondary)]">
-        <div className="max-w-7xl mx-auto px-4 py-4 flex items-center justify-between">
-          <div className="flex items-center gap-3">
-            <div className="w-8 h-8 rounded-lg bg-gradient-to-br from-[#d97756] to-[#b85636] flex items-center justify-center">
-              <Layers className="h-4 w-4 text-white" />
-            </div>
-            <div>
-              <h1 className="text-lg font-semibold text-[var(--text-primary)]">Visual Search</h1>
-              <p className="text-xs text-[var(--text-tertiary)]">Search documents visually with ColPali</p>
-            </div>
-          </div>
-          <nav className="flex items-center gap-2">
-            <Link
-              href="/"
-              className={cn(
-                "h-8 px-3 text-xs inline-flex items-center justify-center font-medium rounded-[var(--radius-md)]",
-                "text-[var(--text-secondary)] hover:text-[var(--text-primary)] hover:bg-[var(--bg-tertiary)]",
-                "transition-all duration-[var(--transition-fast)]"
-              )}
-            >
-              Search
-            </Link>
-            <Link
-              href="/upload"
-              className={cn(
-                "h-8 px-3 text-xs inline-flex items-center justify-center font-medium rounded-[var(--radius-md)]",
-                "text-[var(--text-secondary)] hover:text-[var(--text-primary)] hover:bg-[var(--bg-tertiary)]",
-                "transition-all duration-[var(--transition-fast)]"
-              )}
-            >
-              Upload
-            </Link>
-          </nav>
-        </div>
-      </header>
+      {PAGE_HEADER}
 
       {/* Main content */}
       <main className={cn("max-w-7xl mx-auto px-4 py-8", selectedIds.size > 0 && "pb-24")}>
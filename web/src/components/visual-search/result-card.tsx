@@ -1,5 +1,6 @@
 "use client";
 
+import { memo } from "react";
 import Image from "next/image";
 import { Check, FileText, ExternalLink } from "lucide-react";
 import { cn } from "@/lib/utils";
@@ -10,12 +11,53 @@ interface VisualSearchResultCardProps {
   result: VisualSearchResult;
   index: number;
   isSelected: boolean;
-  onToggleSelect: () => void;
-  onOpenDetail?: () => void;
+  onToggleSelect: (id: string) => void;
+  onOpenDetail?: (result: VisualSearchResult) => void;
   maxRelevance: number;
 }
 
-export function VisualSearchResultCard({
+// Class strings for both selection states, merged once instead of per card render
+const CARD_BASE =
+  "group relative rounded-[var(--radius-lg)] border overflow-hidden transition-all duration-[var(--transition-fast)] cursor-pointer hover:shadow-[var(--shadow-md)]";
+const CARD_CLASS = {
+  selected: cn(CARD_BASE, "border-[var(--accent-primary)] ring-2 ring-[var(--accent-primary)]/30 bg-[var(--accent-glow)]"),
+  unselected: cn(CARD_BASE, "border-[var(--border-primary)] bg-[var(--bg-elevated)] hover:border-[var(--border-accent)]"),
+};
+
+const CHECKBOX_BASE =
+  "absolute top-2 left-2 z-10 w-6 h-6 rounded-full flex items-center justify-center transition-all duration-[var(--transition-fast)]";
+const CHECKBOX_CLASS = {
+  selected: cn(CHECKBOX_BASE, "bg-[var(--accent-primary)] text-white"),
+  unselected: cn(
+    CHECKBOX_BASE,
+    "bg-[var(--bg-elevated)]/90 border border-[var(--border-primary)] text-transparent group-hover:text-[var(--text-tertiary)]"
+  ),
+};
+
+const BADGE_CLASS = {
+  high: cn(
+    "text-[10px] font-mono",
+    "bg-[var(--status-success)]/20 text-[var(--status-success)] border-[var(--status-success)]/30"
+  ),
+  normal: "text-[10px] font-mono",
+};
+
+const IMAGE_CLASS = {
+  selected: "object-contain transition-opacity opacity-100",
+  unselected: "object-contain transition-opacity opacity-90 group-hover:opacity-100",
+};
+
+const CHECK_ICON = <Check className="h-3.5 w-3.5" />;
+const EXTERNAL_LINK_ICON = <ExternalLink className="h-3 w-3" />;
+const PLACEHOLDER_THUMBNAIL = (
+  <div className="absolute inset-0 flex items-center justify-center">
+    <FileText className="h-12 w-12 text-[var(--text-tertiary)]" />
+  </div>
+);
+
+// Memoized: callbacks take the result as an argument so their identity is stable,
+// and a selection change only re-renders the cards whose isSelected flipped
+export const VisualSearchResultCard = memo(function VisualSearchResultCard({
   result,
   index,
   isSelected,
@@ -24,31 +66,17 @@ export function VisualSearchResultCard({
   maxRelevance,
 }: VisualSearchResultCardProps) {
   const normalizedScore = maxRelevance > 0 ? (result.relevance / maxRelevance) * 100 : 0;
+  const selectionState = isSelected ? "selected" : "unselected";
 
   return (
     <div
-      className={cn(
-        "group relative rounded-[var(--radius-lg)] border overflow-hidden",
-        "transition-all duration-[var(--transition-fast)] cursor-pointer",
-        "hover:shadow-[var(--shadow-md)]",
-        isSelected
-          ? "border-[var(--accent-primary)] ring-2 ring-[var(--accent-primary)]/30 bg-[var(--accent-glow)]"
-          : "border-[var(--border-primary)] bg-[var(--bg-elevated)] hover:border-[var(--border-accent)]"
-      )}
-      onClick={onToggleSelect}
+      className={CARD_CLASS[selectionState]}
+      onClick={() => onToggleSelect(result.id)}
     >
       {/* Selection checkbox overlay */}
-      <div
-        className={cn(
-          "absolute top-2 left-2 z-10 w-6 h-6 rounded-full flex items-center justify-center",
-          "transition-all duration-[var(--transition-fast)]",
-          isSelected
-            ? "bg-[var(--accent-primary)] text-white"
-            : "bg-[var(--bg-elevated)]/90 border border-[var(--border-primary)] text-transparent group-hover:text-[var(--text-tertiary)]"
-        )}
-      >
+      <div className={CHECKBOX_CLASS[selectionState]}>
         {isSelected ? (
-          <Check className="h-3.5 w-3.5" />
+          CHECK_ICON
         ) : (
           <span className="text-xs font-medium">{index + 1}</span>
         )}
@@ -58,10 +86,7 @@ export function VisualSearchResultCard({
       <div className="absolute top-2 right-2 z-10">
         <Badge
           variant={normalizedScore > 80 ? "default" : "muted"}
-          className={cn(
-            "text-[10px] font-mono",
-            normalizedScore > 80 && "bg-[var(--status-success)]/20 text-[var(--status-success)] border-[var(--status-success)]/30"
-          )}
+          className={normalizedScore > 80 ? BADGE_CLASS.high : BADGE_CLASS.normal}
         >
           {normalizedScore.toFixed(0)}%
         </Badge>
@@ -74,16 +99,11 @@ export function VisualSearchResultCard({
             src={result.blurImage}
             alt={`${result.title} - Page ${result.pageNumber}`}
             fill
-            className={cn(
-              "object-contain transition-opacity",
-              isSelected ? "opacity-100" : "opacity-90 group-hover:opacity-100"
-            )}
+            className={IMAGE_CLASS[selectionState]}
             unoptimized
           />
         ) : (
-          <div className="absolute inset-0 flex items-center justify-center">
-            <FileText className="h-12 w-12 text-[var(--text-tertiary)]" />
-          </div>
+          PLACEHOLDER_THUMBNAIL
         )}
       </div>
 
@@ -97,11 +117,11 @@ export function VisualSearchResultCard({
             <button
               onClick={(e) => {
                 e.stopPropagation();
-                onOpenDetail();
+                onOpenDetail(result);
               }}
               className="shrink-0 p-1 rounded hover:bg-[var(--bg-tertiary)] text-[var(--text-tertiary)] hover:text-[var(--text-primary)] transition-colors"
             >
-              <ExternalLink className="h-3 w-3" />
+              {EXTERNAL_LINK_ICON}
             </button>
           )}
         </div>
@@ -116,4 +136,4 @@ export function VisualSearchResultCard({
       </div>
     </div>
   );
-}
+});
@@ -1,11 +1,14 @@
 "use client";
 
+import { useCallback, useMemo, type MouseEvent } from "react";
 import { VisualSearchResultCard } from "./result-card";
 import { Button } from "@/components/ui/button";
 import { Skeleton } from "@/components/ui/skeleton";
 import { Search } from "lucide-react";
 import type { VisualSearchResult } from "@/types";
 
+const QUICK_SELECT_COUNTS = [3, 5, 10];
+
 interface VisualSearchResultGridProps {
   results: VisualSearchResult[];
   selectedIds: Set<string>;
@@ -29,7 +32,17 @@ export function VisualSearchResultGrid({
   durationMs,
   totalCount,
 }: VisualSearchResultGridProps) {
-  const maxRelevance = results.length > 0 ? Math.max(...results.map((r) => r.relevance)) : 0;
+  // Derived once per result set, not on every selection change
+  const maxRelevance = useMemo(
+    () => (results.length > 0 ? Math.max(...results.map((r) => r.relevance)) : 0),
+    [results]
+  );
+
+  // One shared handler for the quick-select buttons; the count rides on data-select-top
+  const handleQuickSelect = useCallback(
+    (e: MouseEvent<HTMLButtonElement>) => onSelectTopN(Number(e.currentTarget.dataset.selectTop)),
+    [onSelectTopN]
+  );
 
   if (isLoading) {
     return (
@@ -88,30 +101,18 @@ export function VisualSearchResultGrid({
         </div>
         <div className="flex items-center gap-2">
           <span className="text-xs text-[var(--text-tertiary)] mr-1">Quick select:</span>
-          <Button
-            variant="ghost"
-            size="sm"
-            onClick={() => onSelectTopN(3)}
-            className="h-7 text-xs"
-          >
-            Top 3
-          </Button>
-          <Button
-            variant="ghost"
-            size="sm"
-            onClick={() => onSelectTopN(5)}
-            className="h-7 text-xs"
-          >
-            Top 5
-          </Button>
-          <Button
-            variant="ghost"
-            size="sm"
-            onClick={() => onSelectTopN(10)}
-            className="h-7 text-xs"
-          >
-            Top 10
-          </Button>
+          {QUICK_SELECT_COUNTS.map((n) => (
+            <Button
+              key={n}
+              variant="ghost"
+              size="sm"
+              data-select-top={n}
+              onClick={handleQuickSelect}
+              className="h-7 text-xs"
+            >
+              Top {n}
+            </Button>
+          ))}
           {selectedIds.size > 0 && (
             <Button
               variant="ghost"
@@ -133,8 +134,8 @@ export function VisualSearchResultGrid({
             result={result}
             index={index}
             isSelected={selectedIds.has(result.id)}
-            onToggleSelect={() => onToggleSelect(result.id)}
-            onOpenDetail={onOpenDetail ? () => onOpenDetail(result) : undefined}
+            onToggleSelect={onToggleSelect}
+            onOpenDetail={onOpenDetail}
             maxRelevance={maxRelevance}
           />
         ))}
@@ -8,6 +8,7 @@ import {
   getChatStreamUrl,
   type SearchResponse,
 } from "@/lib/api-client";
+import { coalesceAnswerStream } from "@/lib/answer-stream";
 import { getLogger } from "@/lib/logger";
 
 const logger = getLogger("useSearch");
@@ -112,31 +113,28 @@ export function useSearch() {
           setIsStreaming(true);
           setAnswer({ text: "", citations: [], isStreaming: true });
 
-          const url = getChatStreamUrl(
-            data.query_id,
-            searchQuery,
-            data.doc_ids
-          );
+          const url = getChatStreamUrl(data.query_id, searchQuery);
 
           const es = new EventSource(url);
           eventSourceRef.current = es;
 
-          es.addEventListener("message", (event) => {
-            const text = event.data;
-            setAnswer({
-              text,
-              citations: transformed.map((r, i) => ({
-                sourceIndex: i,
-                resultId: r.id,
-                text: r.title,
-                pageNumber: r.pageNumber,
-                documentTitle: r.title,
-              })),
-              isStreaming: true,
-            });
-          });
+          const citations = transformed.map((r, i) => ({
+            sourceIndex: i,
+            resultId: r.id,
+            text: r.title,
+            pageNumber: r.pageNumber,
+            documentTitle: r.title,
+          }));
+
+          // At most one answer update per animation frame (see lib/answer-stream)
+          const flushPendingText = coalesceAnswerStream(
+            es,
+            (text) => setAnswer({ text, citations, isStreaming: true }),
+            () => eventSourceRef.current === es
+          );
 
           es.addEventListener("close", () => {
+            flushPendingText();
             setAnswer((prev) =>
               prev ? { ...prev, isStreaming: false } : null
             );
@@ -1,6 +1,7 @@
 "use client";
 
 import { useState, useCallback, useRef } from "react";
+import { coalesceAnswerStream } from "@/lib/answer-stream";
 import { correlationHeaders, getLogger } from "@/lib/logger";
 import type { VisualSearchResult, TokenInfo, SynthesisState } from "@/types";
 
@@ -90,7 +91,7 @@ export function useVisualSearch(): UseVisualSearchReturn {
         page_number: number;
         snippet: string;
         text?: string;
-        blur_image?: string;
+        blur_image_url?: string;
         relevance: number;
         url?: string;
         has_original_pdf: boolean;
@@ -100,7 +101,7 @@ export function useVisualSearch(): UseVisualSearchReturn {
         pageNumber: r.page_number,
         snippet: r.snippet,
         text: r.text,
-        blurImage: r.blur_image ? `data:image/jpeg;base64,${r.blur_image}` : undefined,
+        blurImage: r.blur_image_url || undefined,
         relevance: r.relevance,
         url: r.url,
         hasOriginalPdf: r.has_original_pdf,
@@ -182,14 +183,15 @@ export function useVisualSearch(): UseVisualSearchReturn {
     const eventSource = new EventSource(`/api/synthesize?${params}`);
     eventSourceRef.current = eventSource;
 
-    eventSource.addEventListener("message", (event) => {
-      setSynthesis((prev) => ({
-        ...prev,
-        text: event.data,
-      }));
-    });
+    // At most one synthesis update per animation frame (see lib/answer-stream)
+    const flushPendingText = coalesceAnswerStream(
+      eventSource,
+      (text) => setSynthesis((prev) => ({ ...prev, text })),
+      () => eventSourceRef.current === eventSource
+    );
 
     eventSource.addEventListener("close", () => {
+      flushPendingText();
       setSynthesis((prev) => ({
         ...prev,
         isStreaming: false,
@@ -0,0 +1,68 @@
+/**
+ * Frame-coalesced consumption of streamed answer SSE events.
+ *
+ * The chat and synthesis endpoints send "message" events that replace the
+ * displayed text (status and errors) and "delta" events that carry only newly
+ * generated answer text. Tokens arrive far faster than the screen refreshes,
+ * so updates are coalesced and at most one text update per animation frame
+ * reaches React state.
+ *
+ * Usage:
+ *   const flush = coalesceAnswerStream(es, (text) => setAnswer(...), () => ref.current === es);
+ *   es.addEventListener("close", () => { flush(); ... });
+ */
+
+/**
+ * Subscribe to an answer stream's "message" and "delta" events.
+ *
+ * Each flush hands onText the full accumulated text rather than the new
+ * fragment. This is deliberate: the text is rendered as HTML
+ * (dangerouslySetInnerHTML), and a delta can end mid-tag or mid-entity, so
+ * appending fragments to the DOM would produce broken markup. Re-setting the
+ * whole string once per frame keeps the rendering correct and bounds the cost
+ * to the frame rate instead of the token rate.
+ *
+ * @param eventSource - The answer stream
+ * @param onText - Receives the latest full text, at most once per frame
+ * @param isCurrent - Whether the stream is still the active one; stale
+ *   streams are not flushed into state
+ * @returns A function that flushes any pending text immediately (call it
+ *   before handling "close")
+ */
+export function coalesceAnswerStream(
+  eventSource: EventSource,
+  onText: (text: string) => void,
+  isCurrent: () => boolean
+): () => void {
+  let streamedText = "";
+  let pendingText: string | null = null;
+  let frameId = 0;
+
+  const flushPendingText = () => {
+    frameId = 0;
+    if (pendingText === null || !isCurrent()) return;
+    const text = pendingText;
+    pendingText = null;
+    onText(text);
+  };
+
+  const scheduleFlush = (text: string) => {
+    pendingText = text;
+    if (!frameId) frameId = requestAnimationFrame(flushPendingText);
+  };
+
+  eventSource.addEventListener("message", (event) => {
+    streamedText = "";
+    scheduleFlush(event.data);
+  });
+
+  eventSource.addEventListener("delta", (event) => {
+    streamedText += event.data;
+    scheduleFlush(streamedText);
+  });
+
+  return () => {
+    cancelAnimationFrame(frameId);
+    flushPendingText();
+  };
+}
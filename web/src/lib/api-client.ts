@@ -12,7 +12,7 @@ export interface BackendSearchResult {
   page_number: number;
   snippet: string;
   text: string;
-  blur_image: string;
+  blur_image_url: string;
   relevance: number;
   url: string;
 }
@@ -46,9 +46,7 @@ export function transformResult(
     snippet: raw.snippet,
     relevanceScore: Math.min(normalizedScore, 1),
     category: "other",
-    blurImage: raw.blur_image
-      ? `data:image/jpeg;base64,${raw.blur_image}`
-      : undefined,
+    blurImage: raw.blur_image_url || undefined,
     text: raw.text || undefined,
   };
 }
@@ -111,17 +109,13 @@ export async function getFullImage(docId: string): Promise<string> {
 
 /**
  * Returns the URL for the SSE chat stream.
- * The caller should open an EventSource on this URL.
+ * The caller should open an EventSource on this URL. The backend resolves the
+ * result doc IDs from the query ID, so they are not repeated in the URL.
  */
-export function getChatStreamUrl(
-  queryId: string,
-  query: string,
-  docIds: string[]
-): string {
+export function getChatStreamUrl(queryId: string, query: string): string {
   const params = new URLSearchParams({
     query_id: queryId,
     query,
-    doc_ids: docIds.join(","),
   });
   return `/api/chat?${params.toString()}`;
 }